@@ -0,0 +1,108 @@
+import logging
+import re
+import time
+
+ALERT_FIRST = "Сбой в работе программы: {error}"
+ALERT_REPEAT = ("Сбой продолжается: {error}\n"
+                "Повторений за последние {minutes} мин: {count}")
+ALERT_RECOVERY = ("Работа программы восстановлена.\n"
+                  "Ошибок за время сбоя: {count}, длительность {minutes} мин")
+ALERT_SUPPRESSED = "Оповещение {fingerprint} подавлено, повторений: {count}"
+PLACEHOLDER = re.compile(r"\\{[^{}]*\\}")
+
+
+def compile_templates(templates):
+    """Превращает шаблоны сообщений об ошибках в регулярные выражения.
+    Подстановки {...} заменяются на произвольный текст
+    """
+    return [
+        (template, re.compile(
+            PLACEHOLDER.sub(".*", re.escape(template)) + "$", re.DOTALL))
+        for template in templates]
+
+
+def fingerprint(error, patterns=()):
+    """Возвращает отпечаток ошибки: тип исключения и шаблон сообщения.
+    Подставленные в шаблон значения (текст ошибки, параметры запроса)
+    на отпечаток не влияют. Если сообщение не подходит ни к одному
+    шаблону, в отпечаток попадает само сообщение. Сообщение берется
+    из args: str(KeyError) возвращает его в кавычках.
+    """
+    message = str(error.args[0]) if error.args else str(error)
+    for template, pattern in patterns:
+        if pattern.match(message):
+            return f"{type(error).__name__}: {template}"
+    return f"{type(error).__name__}: {message}"
+
+
+class AlertAggregator:
+    """Группирует ошибки по отпечаткам и ограничивает частоту оповещений.
+    По каждому отпечатку оповещение отправляется не чаще раза в window
+    секунд, в повторном оповещении указывается число повторений.
+    Когда ошибок нет recovery секунд, отправляется одно сообщение
+    о восстановлении, если о сбое было оповещение. Время оповещений
+    после восстановления не сбрасывается: сбой, возобновившийся раньше
+    window, не приносит нового оповещения.
+    """
+
+    def __init__(self, send, chat_id, templates=(), window=3600,
+                 recovery=0, clock=time.monotonic):
+        """Параметр send - функция отправки, принимающая chat_id и text."""
+        self.send = send
+        self.chat_id = chat_id
+        self.patterns = compile_templates(templates)
+        self.window = window
+        self.recovery = recovery
+        self.clock = clock
+        self.alerted = {}
+        self.counts = {}
+        self.outage_start = None
+        self.outage_count = 0
+        self.outage_alerted = False
+        self.last_error = None
+
+    def error(self, error):
+        """Учитывает ошибку и при необходимости отправляет оповещение.
+        Возвращает True, если оповещение было отправлено
+        """
+        now = self.clock()
+        key = fingerprint(error, self.patterns)
+        if self.outage_start is None:
+            self.outage_start = now
+        self.outage_count += 1
+        self.last_error = now
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if key not in self.alerted:
+            text = ALERT_FIRST.format(error=error)
+        elif now - self.alerted[key] >= self.window:
+            text = ALERT_REPEAT.format(
+                error=error, count=self.counts[key],
+                minutes=round(self.window / 60))
+        else:
+            logging.debug(ALERT_SUPPRESSED.format(
+                fingerprint=key, count=self.counts[key]))
+            return False
+        self.send(self.chat_id, text)
+        self.alerted[key] = now
+        self.counts[key] = 0
+        self.outage_alerted = True
+        return True
+
+    def success(self):
+        """Отмечает успешный цикл работы.
+        Возвращает True, если было отправлено сообщение о восстановлении
+        """
+        if self.outage_start is None:
+            return False
+        now = self.clock()
+        if now - self.last_error < self.recovery:
+            return False
+        sent = self.outage_alerted
+        if sent:
+            self.send(self.chat_id, ALERT_RECOVERY.format(
+                count=self.outage_count,
+                minutes=round((now - self.outage_start) / 60)))
+        self.outage_start = None
+        self.outage_count = 0
+        self.outage_alerted = False
+        return sent
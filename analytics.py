@@ -0,0 +1,225 @@
+import argparse
+import csv
+import os
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+
+import numpy as np
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+PERCENTILES = (50, 90, 99)
+HOUR = 3600
+REVIEWING = "reviewing"
+VERDICTS = ("approved", "rejected")
+REWORK = "rejected"
+REPORT_HEADER = (
+    "Работ: {homeworks}, переходов статусов: {transitions}\n"
+    "Циклов доработки: {rework} (в среднем {rework_mean:.2f} на работу)")
+REPORT_STATUS = ("Среднее время в статусе {status}: {hours:.1f} ч "
+                 "(работ: {homeworks})")
+REPORT_TURNAROUND = "Время ревью p{percentile}: {hours:.1f} ч"
+REPORT_NO_TURNAROUND = "Завершенных ревью пока нет"
+REPORT_HOMEWORK = "{name}: {statuses}; доработок - {rework}"
+REPORT_HOMEWORK_STATUS = "{status} {hours:.1f} ч"
+
+
+def parse_date(value, default):
+    """Переводит дату из ответа API в timestamp.
+    Если дата отсутствует или в неизвестном формате,
+    возвращает значение по умолчанию
+    """
+    try:
+        return datetime.strptime(value, DATE_FORMAT).replace(
+            tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+class TransitionLog:
+    """Колоночный журнал переходов статусов домашних работ.
+    Переходы хранятся в трех параллельных массивах: номер работы,
+    код статуса (индекс в statuses) и время перехода. Если указан path,
+    журнал дописывается в CSV-файл и восстанавливается из него при запуске.
+    record и stats можно вызывать из разных потоков.
+    """
+
+    def __init__(self, statuses, path=None):
+        """Создает журнал и загружает сохраненные переходы из path."""
+        self.statuses = tuple(statuses)
+        self.codes = {status: code for code, status in enumerate(statuses)}
+        self.path = path
+        self.names = []
+        self.ids = {}
+        self.last_codes = []
+        self.homework_ids = array("q")
+        self.status_codes = array("b")
+        self.timestamps = array("d")
+        self.lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="UTF-8", newline="") as file:
+                for timestamp, status, name in csv.reader(file):
+                    self.add(name, status, float(timestamp))
+
+    def add(self, name, status, timestamp):
+        """Добавляет переход в журнал.
+        Повтор уже известного статуса работы переходом не считается.
+        Возвращает True, если переход был добавлен
+        """
+        code = self.codes[status]
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.last_codes.append(-1)
+        homework_id = self.ids[name]
+        if self.last_codes[homework_id] == code:
+            return False
+        self.last_codes[homework_id] = code
+        self.homework_ids.append(homework_id)
+        self.status_codes.append(code)
+        self.timestamps.append(timestamp)
+        return True
+
+    def record(self, homeworks, current_date=None):
+        """Добавляет в журнал переходы из списка домашних работ.
+        Список - результат check_response. Время перехода берется из
+        date_updated, а при его отсутствии - из current_date ответа API.
+        """
+        default = current_date if current_date is not None else time.time()
+        added = []
+        with self.lock:
+            for homework in homeworks:
+                name = homework.get("homework_name")
+                status = homework.get("status")
+                if name is None or status not in self.codes:
+                    continue
+                timestamp = parse_date(homework.get("date_updated"), default)
+                if self.add(name, status, timestamp):
+                    added.append((timestamp, status, name))
+        if added and self.path is not None:
+            with open(self.path, "a", encoding="UTF-8", newline="") as file:
+                csv.writer(file).writerows(added)
+        return len(added)
+
+    def stats(self):
+        """Считает статистику по журналу, см. compute_stats.
+        Колонки копируются под блокировкой: пока массив отдает буфер
+        numpy, дописывать в него нельзя
+        """
+        with self.lock:
+            columns = (
+                np.array(self.homework_ids, dtype=np.int64),
+                np.array(self.status_codes, dtype=np.int8),
+                np.array(self.timestamps, dtype=np.float64))
+            homeworks_count = len(self.names)
+        return compute_stats(*columns, self.statuses, homeworks_count)
+
+    def report(self, limit=0):
+        """Возвращает текстовый отчет по журналу."""
+        return format_report(self.stats(), self.names, limit)
+
+
+def compute_stats(homework_ids, status_codes, timestamps, statuses,
+                  homeworks_count=None):
+    """Векторно считает статистику ревью по колонкам переходов.
+    Возвращает словарь:
+    time_in_status - матрица (работа x статус) секунд, проведенных
+    в каждом статусе (учитываются только завершенные интервалы);
+    rework - число циклов доработки (переходов в rejected) на работу;
+    turnaround - перцентили времени от reviewing до вердикта.
+    """
+    statuses = tuple(statuses)
+    if homeworks_count is None:
+        homeworks_count = int(homework_ids.max()) + 1 if len(
+            homework_ids) else 0
+    order = np.lexsort((timestamps, homework_ids))
+    ids = homework_ids[order]
+    codes = status_codes[order].astype(np.intp)
+    times = timestamps[order]
+
+    same = ids[1:] == ids[:-1]
+    durations = (times[1:] - times[:-1])[same]
+    from_codes = codes[:-1][same]
+    to_codes = codes[1:][same]
+    interval_ids = ids[:-1][same]
+
+    time_in_status = np.bincount(
+        interval_ids * len(statuses) + from_codes, weights=durations,
+        minlength=homeworks_count * len(statuses),
+    ).reshape(homeworks_count, len(statuses))
+
+    rework = np.bincount(
+        ids[codes == statuses.index(REWORK)], minlength=homeworks_count)
+
+    verdict_codes = [statuses.index(status) for status in VERDICTS]
+    reviewed = (from_codes == statuses.index(REVIEWING)) & np.isin(
+        to_codes, verdict_codes)
+    review_times = durations[reviewed]
+    turnaround = {}
+    if len(review_times):
+        turnaround = dict(zip(
+            PERCENTILES, np.percentile(review_times, PERCENTILES)))
+    return {
+        "statuses": statuses,
+        "transitions": len(codes),
+        "time_in_status": time_in_status,
+        "rework": rework,
+        "turnaround": turnaround,
+    }
+
+
+def format_report(stats, names, limit=0):
+    """Форматирует статистику в текст.
+    limit - сколько работ с наибольшим временем в ревью
+    вывести построчно.
+    """
+    time_in_status = stats["time_in_status"]
+    rework = stats["rework"]
+    homeworks_count = len(rework)
+    lines = [REPORT_HEADER.format(
+        homeworks=homeworks_count, transitions=stats["transitions"],
+        rework=int(rework.sum()),
+        rework_mean=rework.mean() if homeworks_count else 0)]
+    # Среднее считается только по работам, побывавшим в статусе
+    entered = np.count_nonzero(time_in_status, axis=0)
+    totals = time_in_status.sum(axis=0)
+    for status, total, count in zip(stats["statuses"], totals, entered):
+        if count:
+            lines.append(REPORT_STATUS.format(
+                status=status, hours=total / count / HOUR, homeworks=count))
+    if stats["turnaround"]:
+        for percentile, seconds in stats["turnaround"].items():
+            lines.append(REPORT_TURNAROUND.format(
+                percentile=percentile, hours=seconds / HOUR))
+    else:
+        lines.append(REPORT_NO_TURNAROUND)
+    reviewing = stats["statuses"].index(REVIEWING)
+    for homework_id in np.argsort(
+            -time_in_status[:, reviewing], kind="stable")[:limit]:
+        lines.append(REPORT_HOMEWORK.format(
+            name=names[homework_id], rework=rework[homework_id],
+            statuses=", ".join(
+                REPORT_HOMEWORK_STATUS.format(
+                    status=status, hours=seconds / HOUR)
+                for status, seconds in zip(
+                    stats["statuses"], time_in_status[homework_id]))))
+    return "\n".join(lines)
+
+
+def main():
+    """Печатает отчет по сохраненному журналу переходов."""
+    from homework import HOMEWORK_VERDICTS, TRANSITIONS_FILE
+
+    parser = argparse.ArgumentParser(
+        description="Отчет о времени ревью домашних работ")
+    parser.add_argument("path", nargs="?", default=TRANSITIONS_FILE)
+    parser.add_argument(
+        "--limit", type=int, default=10,
+        help="сколько работ с самым долгим ревью вывести")
+    args = parser.parse_args()
+    print(TransitionLog(HOMEWORK_VERDICTS, args.path).report(args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import threading
+from urllib.parse import urlparse
+
+from dotenv import dotenv_values
+
+NOT_POSITIVE = "{name} должно быть положительным целым числом, а не {value}"
+NOT_POSITIVE_NUMBER = "{name} должно быть положительным числом, а не {value}"
+NOT_URL = "{name} должен быть http(s)-адресом, а не {value}"
+EMPTY_VALUE = "{name} не может быть пустым"
+BAD_VERDICTS = "{name} должен быть словарем статус -> вердикт, а не {value}"
+STATUSES_CHANGED = ("Набор статусов {name} меняется только перезапуском: "
+                    "{old} -> {new}")
+BAD_CONFIG_FILE = "Не удалось прочитать {path}: {error}"
+CONFIG_RELOADED = "Настройки перезагружены, изменены: {changed}"
+CONFIG_REJECTED = "Новые настройки не применены: {error}"
+CONFIG_CHANGED = "Файл настроек {path} изменился"
+
+
+def positive_int(name, value, current):
+    """Целое число больше нуля."""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = 0
+    if number <= 0:
+        raise ValueError(NOT_POSITIVE.format(name=name, value=value))
+    return number
+
+
+def positive_number(name, value, current):
+    """Число больше нуля, дробное допускается."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = 0
+    if not number > 0:
+        raise ValueError(NOT_POSITIVE_NUMBER.format(name=name, value=value))
+    return int(number) if number.is_integer() else number
+
+
+def url(name, value, current):
+    """Адрес http или https."""
+    parsed = urlparse(str(value))
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise ValueError(NOT_URL.format(name=name, value=value))
+    return str(value)
+
+
+def token(name, value, current):
+    """Непустая строка."""
+    if not value:
+        raise ValueError(EMPTY_VALUE.format(name=name))
+    return str(value)
+
+
+def verdicts(name, value, current):
+    """Словарь статус -> вердикт, в окружении - JSON.
+    Менять можно только тексты вердиктов, набор статусов
+    фиксируется при запуске
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+    if not isinstance(value, dict) or not all(
+            isinstance(key, str) and isinstance(text, str) and text
+            for key, text in value.items()):
+        raise ValueError(BAD_VERDICTS.format(name=name, value=value))
+    if current is not None and set(value) != set(current):
+        raise ValueError(STATUSES_CHANGED.format(
+            name=name, old=sorted(current), new=sorted(value)))
+    return dict(value)
+
+
+SETTINGS = {
+    "PRACTICUM_TOKEN": ("PRACTICUM_TOKEN", token),
+    "TELEGRAM_TOKEN": ("TELEGRAM_TOKEN", token),
+    "TELEGRAM_CHAT_ID": ("CHAT_TOKEN", token),
+    "RETRY_TIME": ("RETRY_TIME", positive_number),
+    "ONE_MONTH": ("ONE_MONTH", positive_int),
+    "ENDPOINT": ("ENDPOINT", url),
+    "HOMEWORK_VERDICTS": ("HOMEWORK_VERDICTS", verdicts),
+}
+
+
+def load_config(current, env_file=None, config_file=None, environ=None,
+                defaults=None):
+    """Собирает и проверяет настройки из всех источников.
+    Приоритет по возрастанию: значения по умолчанию defaults (если не
+    заданы - текущие значения current), файл .env, окружение процесса
+    (как в load_dotenv, .env его не перекрывает), JSON-файл config_file
+    (имена настроек, как в SETTINGS). Настройка, удаленная из файлов,
+    возвращается к значению по умолчанию. При ошибке проверки выбрасывает
+    ValueError, частично примененных настроек не бывает.
+    """
+    environ = os.environ if environ is None else environ
+    defaults = current if defaults is None else defaults
+    env = {}
+    if env_file is not None and os.path.exists(env_file):
+        env.update(dotenv_values(env_file))
+    env.update(environ)
+    overrides = {}
+    if config_file is not None and os.path.exists(config_file):
+        try:
+            with open(config_file, encoding="UTF-8") as file:
+                overrides = json.load(file)
+        except (OSError, ValueError) as error:
+            raise ValueError(
+                BAD_CONFIG_FILE.format(path=config_file, error=error))
+    settings = {}
+    for name, (env_name, validate) in SETTINGS.items():
+        value = defaults.get(name)
+        if env_name in env:
+            value = env[env_name]
+        if name in overrides:
+            value = overrides[name]
+        settings[name] = validate(name, value, current.get(name))
+    return settings
+
+
+class ConfigWatcher:
+    """Следит за файлами настроек и перезагружает их по запросу.
+    Перезагрузку запрашивает SIGHUP (метод request) или фоновая
+    проверка времени изменения файлов paths. Сама перезагрузка
+    выполняется в основном цикле вызовом reload, поэтому настройки
+    меняются между итерациями, а не посреди них.
+    """
+
+    def __init__(self, load, apply, paths=()):
+        """Параметры load и apply - функции загрузки и применения.
+        load возвращает новые настройки или выбрасывает ValueError,
+        apply применяет их и возвращает имена измененных настроек.
+        """
+        self.load = load
+        self.apply = apply
+        self.paths = [path for path in paths if path]
+        self.event = threading.Event()
+        self.mtimes = self.snapshot()
+
+    def snapshot(self):
+        """Время изменения отслеживаемых файлов."""
+        return {path: os.path.getmtime(path) if os.path.exists(path) else None
+                for path in self.paths}
+
+    def request(self, *args):
+        """Запрашивает перезагрузку. Подходит как обработчик сигнала."""
+        self.event.set()
+
+    def check(self):
+        """Запрашивает перезагрузку, если файлы изменились."""
+        mtimes = self.snapshot()
+        if mtimes != self.mtimes:
+            for path in self.paths:
+                if mtimes[path] != self.mtimes[path]:
+                    logging.info(CONFIG_CHANGED.format(path=path))
+            self.mtimes = mtimes
+            self.request()
+
+    def watch(self, interval, stop=None):
+        """Периодически проверяет файлы настроек."""
+        stop = stop or threading.Event()
+        while not stop.wait(interval):
+            self.check()
+
+    def start(self, interval, stop=None):
+        """Запускает watch в фоновом потоке до установки события stop."""
+        thread = threading.Thread(
+            target=self.watch, args=(interval, stop), name="config",
+            daemon=True)
+        thread.start()
+        return thread
+
+    def wait(self, timeout):
+        """Ждет timeout секунд или запроса перезагрузки.
+        Возвращает True, если перезагрузка запрошена
+        """
+        return self.event.wait(max(timeout, 0))
+
+    def reload(self):
+        """Загружает и применяет настройки.
+        Если новые настройки не прошли проверку, остаются старые.
+        Возвращает множество измененных настроек
+        """
+        self.event.clear()
+        try:
+            settings = self.load()
+        except ValueError as error:
+            logging.error(CONFIG_REJECTED.format(error=error))
+            return set()
+        changed = self.apply(settings)
+        logging.info(CONFIG_RELOADED.format(changed=sorted(changed)))
+        return changed
@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import time
+
+DIGEST_HEADER = "Изменения статусов домашних работ ({count}):"
+DIGEST_ITEM = "- {message}"
+DIGEST_SENT = "Отправлена сводка из {count} сообщений в чат {chat_id}"
+
+
+class Digest:
+    """Накапливает сообщения об изменении статусов и отправляет их сводкой.
+    Сводка уходит в чат, когда в нем накопилось size сообщений или
+    с момента первого накопленного сообщения прошло interval секунд.
+    Сообщения со статусами из immediate отправляются сразу вместе
+    с уже накопленной сводкой чата.
+    При size=1 каждое сообщение отправляется сразу, как без сводок.
+    Если указан path, накопленные сводки сохраняются в JSON-файл
+    и переживают перезапуск; clock тогда должен отсчитывать время
+    от эпохи (time.time).
+    """
+
+    def __init__(self, send, interval=0, size=1, immediate=(),
+                 clock=time.monotonic, path=None):
+        """Параметр send - функция отправки, принимающая chat_id и text."""
+        self.send = send
+        self.interval = interval
+        self.size = size
+        self.immediate = frozenset(immediate)
+        self.clock = clock
+        self.path = path
+        self.pending = {}
+        self.started = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="UTF-8") as file:
+                for chat_id, started, messages in json.load(file):
+                    self.pending[chat_id] = messages
+                    self.started[chat_id] = started
+
+    def save(self):
+        """Атомарно сохраняет накопленные сводки в path."""
+        if self.path is None:
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="UTF-8") as file:
+            json.dump(
+                [[chat_id, self.started[chat_id], messages]
+                 for chat_id, messages in self.pending.items()],
+                file, ensure_ascii=False)
+        os.replace(temporary, self.path)
+
+    def add(self, chat_id, status, message):
+        """Добавляет сообщение в сводку чата.
+        Срочный статус отправляется вместе с накопленной сводкой,
+        чтобы не обогнать более ранние сообщения. Повтор последнего
+        сообщения после неудачной отправки не дублируется.
+        Возвращает число сделанных отправок
+        """
+        if chat_id not in self.pending:
+            self.pending[chat_id] = []
+            self.started[chat_id] = self.clock()
+        messages = self.pending[chat_id]
+        if not messages or messages[-1] != message:
+            messages.append(message)
+            self.save()
+        if status in self.immediate or len(messages) >= self.size:
+            return self.flush_chat(chat_id)
+        return 0
+
+    def flush(self, force=False):
+        """Отправляет сводки, для которых истек interval.
+        С force=True отправляет все накопленные сводки.
+        Возвращает число сделанных отправок
+        """
+        now = self.clock()
+        due = [chat_id for chat_id, started in self.started.items()
+               if force or now - started >= self.interval]
+        return sum(self.flush_chat(chat_id) for chat_id in due)
+
+    def flush_chat(self, chat_id):
+        """Отправляет сводку одного чата.
+        Если отправка не удалась, сообщения остаются в сводке
+        """
+        messages = self.pending[chat_id]
+        if len(messages) == 1:
+            self.send(chat_id, messages[0])
+        else:
+            self.send(chat_id, "\n".join(
+                [DIGEST_HEADER.format(count=len(messages))]
+                + [DIGEST_ITEM.format(message=message)
+                   for message in messages]))
+            logging.info(DIGEST_SENT.format(
+                count=len(messages), chat_id=chat_id))
+        del self.pending[chat_id]
+        del self.started[chat_id]
+        self.save()
+        return 1
@@ -0,0 +1,322 @@
+import argparse
+import json
+import logging
+import random
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+
+import requests
+import telegram
+
+from digest import Digest
+from outbox import Outbox
+
+HOMEWORK_NAME = "fault-hw-{number}"
+HOMEWORK_PATTERN = re.compile(r"fault-hw-(\d+)")
+STATUS_CYCLE = ("reviewing", "rejected", "reviewing", "approved")
+PARTIAL_BODY = '{"homeworks": [{"homework_name": "fault-hw-'
+UNKNOWN_DISTRIBUTION = "Неизвестное распределение задержки: {name}"
+REPORT = (
+    "Циклов: {cycles} за {elapsed:.2f} с ({throughput:.1f} циклов/с)\n"
+    "Практикум: {practicum}\n"
+    "Telegram: {telegram}\n"
+    "Изменений статуса: {changes}, замечено ботом: {observed}, "
+    "доставлено: {delivered}, в очереди: {queued}, потеряно: {lost}\n"
+    "Задержка уведомления: {delays}")
+REPORT_DELAYS = "p50 {p50:.3f} с, p90 {p90:.3f} с, max {max:.3f} с"
+REPORT_NO_DELAYS = "нет доставленных уведомлений"
+FAULT_TIMEOUT = "timeout"
+FAULT_MALFORMED = "malformed_json"
+FAULT_PARTIAL = "partial_body"
+FAULT_OK = "ok"
+
+
+def make_latency(spec):
+    """Создает функцию, возвращающую случайную задержку в секундах.
+    Распределения: fixed (value), uniform (low, high),
+    exponential (mean), lognormal (mu, sigma).
+    """
+    spec = spec or {"distribution": "fixed", "value": 0}
+    name = spec.get("distribution", "fixed")
+    if name == "fixed":
+        return lambda rng: spec.get("value", 0)
+    if name == "uniform":
+        return lambda rng: rng.uniform(spec["low"], spec["high"])
+    if name == "exponential":
+        return lambda rng: rng.expovariate(1 / spec["mean"])
+    if name == "lognormal":
+        return lambda rng: rng.lognormvariate(spec["mu"], spec["sigma"])
+    raise ValueError(UNKNOWN_DISTRIBUTION.format(name=name))
+
+
+class FaultProfile:
+    """Вероятности сбоев и распределение задержки для одного сервиса.
+    Поля сценария: latency, timeout (вероятность), timeout_after
+    (сколько секунд ждать до таймаута), status_codes ({код: вероятность}),
+    malformed_json и partial_body (вероятности).
+    """
+
+    def __init__(self, spec, rng):
+        """Параметр spec - раздел сценария для сервиса."""
+        spec = spec or {}
+        self.rng = rng
+        self.latency = make_latency(spec.get("latency"))
+        self.timeout_after = spec.get("timeout_after", 0)
+        self.faults = [(FAULT_TIMEOUT, spec.get("timeout", 0))]
+        self.faults += [
+            (int(code), probability)
+            for code, probability in spec.get("status_codes", {}).items()]
+        self.faults += [
+            (FAULT_MALFORMED, spec.get(FAULT_MALFORMED, 0)),
+            (FAULT_PARTIAL, spec.get(FAULT_PARTIAL, 0))]
+
+    def pick(self):
+        """Выбирает исход вызова: сбой или FAULT_OK."""
+        draw = self.rng.random()
+        for fault, probability in self.faults:
+            if draw < probability:
+                return fault
+            draw -= probability
+        return FAULT_OK
+
+    def delay(self):
+        """Выдерживает случайную задержку."""
+        time.sleep(max(self.latency(self.rng), 0))
+
+
+class FakeResponse:
+    """Ответ Практикума, собранный инжектором."""
+
+    def __init__(self, status_code, text):
+        """Параметр text - тело ответа."""
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        """Разбирает тело как JSON, битое тело - ValueError."""
+        return json.loads(self.text)
+
+
+class FaultyBot:
+    """Заменитель telegram.Bot, отправляющий сообщения со сбоями."""
+
+    def __init__(self, injector):
+        """Параметр injector - FaultInjector, ведущий статистику."""
+        self.injector = injector
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Имитирует отправку сообщения."""
+        return self.injector.send(chat_id, text)
+
+    def get_updates(self, offset=None, timeout=0, **kwargs):
+        """Команд в режиме инжекции нет, долгий опрос ждет конца прогона."""
+        self.injector.stop.wait(timeout)
+        return []
+
+
+class FaultInjector:
+    """Имитирует API Практикума и Telegram со сбоями по сценарию.
+    Работает без сети: Практикум отдает одну работу, статус которой
+    меняется с вероятностью change_rate на каждом опросе, Telegram
+    только запоминает время доставки. С "passthrough": true запросы
+    к Практикуму после задержки уходят в настоящий API.
+    На опросе номер cycles устанавливается событие stop, которое
+    завершает main() после этого цикла.
+    """
+
+    def __init__(self, scenario, real_get=requests.get, stop=None):
+        """Параметр scenario - словарь, загруженный из файла сценария."""
+        self.stop = stop or threading.Event()
+        self.rng = random.Random(scenario.get("seed"))
+        self.cycles = scenario.get("cycles", 100)
+        self.change_rate = scenario.get("change_rate", 0.5)
+        self.passthrough = scenario.get("passthrough", False)
+        self.real_get = real_get
+        self.practicum = FaultProfile(scenario.get("practicum"), self.rng)
+        self.telegram = FaultProfile(scenario.get("telegram"), self.rng)
+        self.lock = threading.Lock()
+        self.polls = 0
+        self.outcomes = {"practicum": {}, "telegram": {}}
+        self.changes = [time.monotonic()]
+        self.observed = set()
+        self.delays = {}
+
+    def count(self, service, outcome):
+        """Учитывает исход вызова сервиса."""
+        with self.lock:
+            outcomes = self.outcomes[service]
+            outcomes[str(outcome)] = outcomes.get(str(outcome), 0) + 1
+
+    def homework(self):
+        """Текущая работа: имя меняется с каждым изменением статуса."""
+        number = len(self.changes) - 1
+        return {
+            "homework_name": HOMEWORK_NAME.format(number=number),
+            "status": STATUS_CYCLE[number % len(STATUS_CYCLE)]}
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        """Заменитель requests.get для запросов к Практикуму."""
+        self.polls += 1
+        if self.polls >= self.cycles:
+            self.stop.set()
+        if self.rng.random() < self.change_rate:
+            self.changes.append(time.monotonic())
+        fault = self.practicum.pick()
+        self.practicum.delay()
+        self.count("practicum", fault)
+        if fault == FAULT_TIMEOUT:
+            time.sleep(self.practicum.timeout_after)
+            raise requests.exceptions.Timeout(url)
+        if isinstance(fault, int):
+            return FakeResponse(fault, HTTPStatus(fault).phrase)
+        if fault == FAULT_MALFORMED:
+            return FakeResponse(HTTPStatus.OK, "<html>Bad Gateway</html>")
+        if fault == FAULT_PARTIAL:
+            return FakeResponse(HTTPStatus.OK, PARTIAL_BODY)
+        if self.passthrough:
+            return self.real_get(url, headers=headers, params=params, **kwargs)
+        self.observed.add(len(self.changes) - 1)
+        return FakeResponse(HTTPStatus.OK, json.dumps({
+            "homeworks": [self.homework()],
+            "current_date": int(time.time())}))
+
+    def bot(self, *args, **kwargs):
+        """Заменитель конструктора telegram.Bot."""
+        return FaultyBot(self)
+
+    def send(self, chat_id, text):
+        """Имитирует отправку в Telegram и замеряет задержку уведомлений."""
+        fault = self.telegram.pick()
+        self.telegram.delay()
+        self.count("telegram", fault)
+        if fault == FAULT_TIMEOUT:
+            time.sleep(self.telegram.timeout_after)
+            raise telegram.error.TimedOut()
+        if fault == HTTPStatus.TOO_MANY_REQUESTS:
+            raise telegram.error.RetryAfter(1)
+        if fault != FAULT_OK:
+            raise telegram.error.NetworkError(str(fault))
+        now = time.monotonic()
+        with self.lock:
+            for number in HOMEWORK_PATTERN.findall(text or ""):
+                self.delays.setdefault(
+                    int(number), now - self.changes[int(number)])
+        return text
+
+    def report(self, elapsed, queued=()):
+        """Возвращает итоговую статистику прогона.
+        queued - тексты, оставшиеся в очереди отправки и сводках: такие
+        изменения не доставлены, но и не потеряны
+        """
+        waiting = {int(number) for text in queued
+                   for number in HOMEWORK_PATTERN.findall(text)}
+        waiting -= set(self.delays)
+        delays = sorted(self.delays.values())
+        if delays:
+            delays_text = REPORT_DELAYS.format(
+                p50=delays[len(delays) // 2],
+                p90=delays[min(len(delays) - 1, len(delays) * 9 // 10)],
+                max=delays[-1])
+        else:
+            delays_text = REPORT_NO_DELAYS
+        return REPORT.format(
+            cycles=self.polls, elapsed=elapsed,
+            throughput=self.polls / elapsed if elapsed else 0,
+            practicum=self.outcomes["practicum"],
+            telegram=self.outcomes["telegram"],
+            changes=len(self.changes), observed=len(self.observed),
+            delivered=len(self.delays), queued=len(waiting),
+            lost=len(self.observed - set(self.delays) - waiting),
+            delays=delays_text)
+
+
+@contextmanager
+def patched(obj, **attrs):
+    """Временно подменяет атрибуты объекта."""
+    saved = {name: getattr(obj, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(obj, name, value)
+    try:
+        yield obj
+    finally:
+        for name, value in saved.items():
+            setattr(obj, name, value)
+
+
+def queued_texts(outbox_file, digest_file):
+    """Возвращает тексты, которые бот не успел отправить.
+    Это строки очереди отправки и накопленные сводки
+    """
+    queue = Outbox({}, outbox_file)
+    try:
+        texts = [text for text, in queue.execute("SELECT text FROM outbox")]
+    finally:
+        queue.close()
+    pending = Digest(print, path=digest_file).pending
+    return texts + [text for messages in pending.values()
+                    for text in messages]
+
+
+def run(scenario, workdir, injector=None):
+    """Запускает main() бота под инжектором и возвращает отчет.
+    Файлы бота (очередь, сводки, журнал переходов) создаются в workdir,
+    окружение, .env и CONFIG_FILE не читаются, watchdog настроен так,
+    чтобы не считать короткий RETRY_TIME сценария зависанием.
+    Паузу между повторами очереди задают outbox_base_delay и
+    outbox_max_delay сценария, оставшееся в очереди попадает в отчет.
+    Вместо инжектора по сценарию можно передать готовый injector
+    """
+    import homework
+
+    injector = injector or FaultInjector(scenario)
+
+    def load_settings():
+        return {name: getattr(homework, name) for name in homework.SETTINGS}
+
+    settings = dict(
+        PRACTICUM_TOKEN="fault-injection", TELEGRAM_TOKEN="fault-injection",
+        TELEGRAM_CHAT_ID="fault-injection",
+        RETRY_TIME=scenario.get("retry_time", 0.01),
+        OUTBOX_FILE=f"{workdir}/outbox.sqlite3",
+        DIGEST_FILE=f"{workdir}/digest.json",
+        TRANSITIONS_FILE=f"{workdir}/transitions.csv",
+        OUTBOX_RETRY_TIME=scenario.get(
+            "outbox_retry_time", homework.OUTBOX_RETRY_TIME),
+        OUTBOX_BASE_DELAY=scenario.get(
+            "outbox_base_delay", homework.OUTBOX_BASE_DELAY),
+        OUTBOX_MAX_DELAY=scenario.get(
+            "outbox_max_delay", homework.OUTBOX_MAX_DELAY),
+        ENV_FILE="", CONFIG_FILE=None, HEALTH_PORT=None,
+        WATCHDOG_FACTOR=1000, HEADERS=homework.HEADERS,
+        load_settings=load_settings)
+    started = time.monotonic()
+    with patched(homework, **settings), patched(
+            requests, get=injector.get), patched(telegram, Bot=injector.bot):
+        homework.main(injector.stop)
+    elapsed = time.monotonic() - started
+    return injector.report(elapsed, queued_texts(
+        settings["OUTBOX_FILE"], settings["DIGEST_FILE"]))
+
+
+def main():
+    """Прогоняет сценарий из файла и печатает отчет."""
+    parser = argparse.ArgumentParser(
+        description="Прогон бота со сбоями Практикума и Telegram")
+    parser.add_argument("scenario", help="JSON-файл сценария")
+    parser.add_argument(
+        "--verbose", action="store_true", help="выводить лог бота")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.CRITICAL + 1)
+    with open(args.scenario, encoding="UTF-8") as file:
+        scenario = json.load(file)
+    with tempfile.TemporaryDirectory() as workdir:
+        print(run(scenario, workdir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EVENTS = ("start", "cycle", "poll", "send")
+LOOP_STALLED = ("Основной цикл не завершался {seconds:.0f} с. "
+                "Стеки потоков:\n{stacks}")
+LOOP_RESUMED = "Основной цикл возобновил работу"
+THREAD_STACK = "Поток {name} ({ident}):\n{stack}"
+SERVER_STARTED = "Проверки здоровья доступны на порту {port}"
+
+
+class HealthState:
+    """Время последних событий основного цикла.
+    start - запуск, cycle - начало очередного цикла,
+    poll - успешный запрос к API, send - успешная отправка сообщения.
+    Цикл считается зависшим, если cycle не обновлялся stall_after секунд.
+    """
+
+    def __init__(self, stall_after, clock=time.monotonic):
+        """Параметр stall_after - допустимая длительность цикла в секундах."""
+        self.stall_after = stall_after
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.events = dict.fromkeys(EVENTS)
+        self.mark("start")
+        self.mark("cycle")
+
+    def mark(self, event):
+        """Запоминает время события."""
+        with self.lock:
+            self.events[event] = self.clock()
+
+    def tracked(self, event, func):
+        """Оборачивает функцию, отмечая event после ее успешного вызова."""
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            self.mark(event)
+            return result
+        return wrapper
+
+    def since(self):
+        """Возвращает, сколько секунд прошло с каждого события.
+        Для событий, которых еще не было, возвращает None
+        """
+        now = self.clock()
+        with self.lock:
+            return {event: None if moment is None else now - moment
+                    for event, moment in self.events.items()}
+
+    def healthy(self):
+        """Цикл жив: очередной цикл начинался не позже stall_after."""
+        return self.since()["cycle"] < self.stall_after
+
+    def ready(self):
+        """Бот готов: API успешно опрашивался не позже stall_after."""
+        poll = self.since()["poll"]
+        return poll is not None and poll < self.stall_after
+
+
+def thread_stacks():
+    """Возвращает стеки всех потоков процесса в виде текста."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    return "\n".join(
+        THREAD_STACK.format(
+            name=names.get(ident, "?"), ident=ident,
+            stack="".join(traceback.format_stack(frame)))
+        for ident, frame in sys._current_frames().items())
+
+
+def watchdog(state, interval, stop=None):
+    """Следит за основным циклом и пишет в лог стеки потоков при зависании.
+    Стеки пишутся один раз на каждое зависание
+    """
+    stop = stop or threading.Event()
+    stalled = False
+    while not stop.wait(interval):
+        if state.healthy():
+            if stalled:
+                logging.info(LOOP_RESUMED)
+            stalled = False
+        elif not stalled:
+            stalled = True
+            logging.critical(LOOP_STALLED.format(
+                seconds=state.since()["cycle"], stacks=thread_stacks()))
+
+
+def start_watchdog(state, interval, stop=None):
+    """Запускает watchdog в фоновом потоке до установки события stop."""
+    thread = threading.Thread(
+        target=watchdog, args=(state, interval, stop), name="watchdog",
+        daemon=True)
+    thread.start()
+    return thread
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Обработчик /healthz и /readyz."""
+
+    state = None
+
+    def do_GET(self):
+        """Отвечает JSON со временем с последних событий."""
+        checks = {"/healthz": self.state.healthy, "/readyz": self.state.ready}
+        if self.path not in checks:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        ok = checks[self.path]()
+        body = json.dumps({"ok": ok, "since": self.state.since()}).encode()
+        self.send_response(
+            HTTPStatus.OK if ok else HTTPStatus.SERVICE_UNAVAILABLE)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Пишет запросы в лог уровня DEBUG, а не в stderr."""
+        logging.debug(format, *args)
+
+
+def start_server(state, port, host=""):
+    """Запускает HTTP-сервер проверок здоровья в фоновом потоке."""
+    handler = type("Handler", (HealthHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(
+        target=server.serve_forever, name="health-server", daemon=True,
+    ).start()
+    logging.info(SERVER_STARTED.format(port=server.server_address[1]))
+    return server
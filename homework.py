@@ -1,17 +1,35 @@
 import logging
 import os
+import signal
+import threading
 import time
+from contextlib import ExitStack
+from functools import partial
 from http import HTTPStatus
 import requests
 import telegram
-from dotenv import load_dotenv
+from dotenv import find_dotenv, load_dotenv
 
+from alerts import AlertAggregator
+from analytics import TransitionLog
+from config import SETTINGS, ConfigWatcher, load_config
+from digest import Digest
+from health import HealthState, start_server, start_watchdog
+from notifiers import (TELEGRAM, SmtpNotifier, TelegramNotifier,
+                       WebhookNotifier)
+from outbox import Outbox, start_retrier
+from state import StateStore
+from tracing import (SamplingProfiler, Tracer, install_http_tracing,
+                     install_profiler_signal)
+
+ENVIRON = dict(os.environ)
 load_dotenv()
 
 
 PRACTICUM_TOKEN = os.getenv("PRACTICUM_TOKEN")
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("CHAT_TOKEN")
+ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID")
 
 RETRY_TIME = 600
 ONE_MONTH = 3600 * 24 * 30
@@ -40,12 +58,48 @@ HOMEWORK_VERDICTS = {
     "reviewing": "Работа взята на проверку ревьюером.",
     "rejected": "Работа проверена: у ревьюера есть замечания."}
 TOKENS = ("PRACTICUM_TOKEN", "TELEGRAM_TOKEN", "TELEGRAM_CHAT_ID")
+TRANSITIONS_FILE = os.path.join(os.path.dirname(__file__), "transitions.csv")
+STATS_COMMAND = "/stats"
+COMMANDS_TIMEOUT = 30
+COMMANDS_RETRY_TIME = 5
+DIGEST_INTERVAL = int(os.getenv("DIGEST_INTERVAL", 0))
+DIGEST_SIZE = int(os.getenv("DIGEST_SIZE", 1))
+DIGEST_IMMEDIATE = os.getenv("DIGEST_IMMEDIATE", "approved").split(",")
+ALERT_WINDOW = int(os.getenv("ALERT_WINDOW", 3600))
+ALERT_RECOVERY = int(os.getenv("ALERT_RECOVERY", 0))
+ALERT_RECOVERY_CYCLES = 3
+ERROR_TEMPLATES = (
+    CONNECTION_PROBLEM, BAD_STATUS_CODE, API_TROUBLE, API_NOT_A_DICT,
+    HOMEWORKS_NOT_A_LIST, INVALID_STATUS, MISSING_KEY)
+HEALTH_PORT = os.getenv("HEALTH_PORT") or os.getenv("PORT")
+WATCHDOG_FACTOR = int(os.getenv("WATCHDOG_FACTOR", 2))
+WATCHDOG_INTERVAL = 5
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 25))
+SMTP_FROM = os.getenv("SMTP_FROM")
+SMTP_TO = os.getenv("SMTP_TO", "").split(",")
+OUTBOX_FILE = os.path.join(os.path.dirname(__file__), "outbox.sqlite3")
+DIGEST_FILE = os.path.join(os.path.dirname(__file__), "digest.json")
+OUTBOX_RETRY_TIME = int(os.getenv("OUTBOX_RETRY_TIME", 60))
+OUTBOX_BASE_DELAY = float(os.getenv("OUTBOX_BASE_DELAY", 30))
+OUTBOX_MAX_DELAY = float(os.getenv("OUTBOX_MAX_DELAY", 3600))
+TRACER = Tracer(os.getenv("TRACE_FILE"))
+PROFILE_PREFIX = __file__ + ".profile"
+ENV_FILE = find_dotenv()
+CONFIG_FILE = os.getenv("CONFIG_FILE")
+CONFIG_POLL_INTERVAL = 5
+JOIN_TIMEOUT = 5
+RESTART_REQUIRED = "Изменение {name} вступит в силу после перезапуска"
+RESTART_ONLY = ("TELEGRAM_TOKEN", "ONE_MONTH")
+DEFAULTS = {name: globals()[name] for name in SETTINGS}
 
 
 class CustomBotException(Exception):
     """Универсальное исключение для бота."""
 
 
+@TRACER.traced
 def send_message(bot, message):
     """Отправляет сообщение в Telegram чат.
     Определяемый переменной окружения TELEGRAM_CHAT_ID.
@@ -55,6 +109,7 @@ def send_message(bot, message):
     return bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
 
 
+@TRACER.traced
 def get_api_answer(current_timestamp):
     """Делает запрос к сервису API с информацией о проверке домашней работы.
     Параметр переданный в функцию - временная метка.
@@ -72,7 +127,8 @@ def get_api_answer(current_timestamp):
         raise ValueError(BAD_STATUS_CODE.format(
             **request_params, status_code=response.status_code))
     logging.info("Получен ответ от сервера")
-    api_json = response.json()
+    with TRACER.span("json_decode"):
+        api_json = response.json()
     for key in ("code", "error"):
         if key in api_json:
             raise ValueError(API_TROUBLE.format(
@@ -80,6 +136,7 @@ def get_api_answer(current_timestamp):
     return api_json
 
 
+@TRACER.traced
 def check_response(response):
     """Проверяет ответ API на корректность.
     В качестве параметра функция получает ответ API,
@@ -100,6 +157,7 @@ def check_response(response):
     return homeworks
 
 
+@TRACER.traced
 def parse_status(homework):
     """Извлекает из информации о конкретной домашней работе статус этой работы.
     В качестве параметра функция получает только один элемент из списка
@@ -120,6 +178,156 @@ def parse_status(homework):
         name=homework.get("homework_name"), verdict=verdict)
 
 
+def answer_commands(bot, offset, transitions, timeout=0):
+    """Отвечает на команды, присланные боту в чат TELEGRAM_CHAT_ID.
+    Сейчас поддерживается только /stats - отчет о времени ревью.
+    Возвращает offset для следующего запроса обновлений
+    """
+    for update in bot.get_updates(offset=offset, timeout=timeout):
+        offset = update.update_id + 1
+        message = update.message
+        if (message is not None and message.text == STATS_COMMAND
+                and str(message.chat_id) == str(TELEGRAM_CHAT_ID)):
+            send_message(bot, transitions.report())
+    return offset
+
+
+def listen_commands(bot, transitions, stop=None):
+    """Отвечает на команды в фоне, независимо от опроса API.
+    Обновления запрашиваются долгим опросом на COMMANDS_TIMEOUT секунд,
+    после ошибки запрос повторяется через COMMANDS_RETRY_TIME
+    """
+    stop = stop or threading.Event()
+    offset = None
+    while not stop.is_set():
+        try:
+            offset = answer_commands(
+                bot, offset, transitions, COMMANDS_TIMEOUT)
+        except Exception as error:
+            logging.error(PROGRAM_FAILURE.format(error=error))
+            stop.wait(COMMANDS_RETRY_TIME)
+
+
+def start_commands(bot, transitions, stop=None):
+    """Запускает listen_commands в фоновом потоке до установки stop."""
+    thread = threading.Thread(
+        target=listen_commands, args=(bot, transitions, stop),
+        name="commands", daemon=True)
+    thread.start()
+    return thread
+
+
+def make_notifiers(bot):
+    """Создает способы доставки сообщений о статусе.
+    Telegram используется всегда, webhook и почта - если заданы
+    соответствующие переменные окружения
+    """
+    notifiers = [TelegramNotifier(bot)]
+    if WEBHOOK_URL:
+        notifiers.append(WebhookNotifier(WEBHOOK_URL))
+    if SMTP_HOST:
+        notifiers.append(
+            SmtpNotifier(SMTP_HOST, SMTP_PORT, SMTP_FROM, SMTP_TO))
+    return notifiers
+
+
+def load_settings():
+    """Загружает настройки из окружения, файла .env и CONFIG_FILE.
+    Окружение берется до load_dotenv, иначе .env нельзя было бы
+    перечитать: его значения уже лежали бы в os.environ
+    """
+    return load_config(
+        {name: globals()[name] for name in SETTINGS}, ENV_FILE, CONFIG_FILE,
+        ENVIRON, DEFAULTS)
+
+
+def apply_settings(settings):
+    """Подменяет настройки бота новыми одним обновлением globals.
+    Возвращает множество измененных настроек
+    """
+    changed = {name for name, value in settings.items()
+               if globals()[name] != value}
+    globals().update(
+        settings,
+        HEADERS={"Authorization": f"OAuth {settings['PRACTICUM_TOKEN']}"})
+    for name in RESTART_ONLY:
+        if name in changed:
+            logging.warning(RESTART_REQUIRED.format(name=name))
+    return changed
+
+
+def stop_on_exit(stack, stop, thread, wakeup=None):
+    """Регистрирует в stack (contextlib.ExitStack) остановку потока.
+    При выходе устанавливается stop, будится wakeup, если поток ждет
+    его, а не stop, и поток ожидается не дольше JOIN_TIMEOUT секунд
+    """
+    stack.callback(thread.join, JOIN_TIMEOUT)
+    if wakeup is not None:
+        stack.callback(wakeup.set)
+    stack.callback(stop.set)
+    return thread
+
+
+def restore_signals_on_exit(stack):
+    """Регистрирует в stack возврат обработчиков SIGHUP и SIGUSR1."""
+    for name in ("SIGHUP", "SIGUSR1"):
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            stack.callback(signal.signal, signum, signal.getsignal(signum))
+
+
+def start_delivery(stack, stop, bot, health):
+    """Создает очередь отправки по всем способам доставки.
+    У каждого способа свой поток отправки, они останавливаются
+    при выходе из stack.
+    Возвращает очередь (Outbox)
+    """
+    outbox = Outbox(
+        {repr(notifier): health.tracked(
+            "send", TRACER.traced(notifier.send, "send_message"))
+         for notifier in make_notifiers(bot)},
+        OUTBOX_FILE, base_delay=OUTBOX_BASE_DELAY,
+        max_delay=OUTBOX_MAX_DELAY)
+    stack.callback(outbox.close)
+    threads = start_retrier(outbox, OUTBOX_RETRY_TIME, stop)
+    for sink, thread in threads.items():
+        stop_on_exit(stack, stop, thread, outbox.wakeups[sink])
+    return outbox
+
+
+def start_config(stack, stop):
+    """Применяет настройки и запускает слежение за их изменением.
+    Перезагрузку также можно запросить сигналом SIGHUP
+    """
+    config = ConfigWatcher(
+        load_settings, apply_settings, (ENV_FILE, CONFIG_FILE))
+    config.reload()
+    stop_on_exit(stack, stop, config.start(CONFIG_POLL_INTERVAL, stop))
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, config.request)
+    return config
+
+
+def tune(health, alerts):
+    """Передает текущие настройки долгоживущим объектам основного цикла."""
+    health.stall_after = WATCHDOG_FACTOR * RETRY_TIME
+    alerts.chat_id = ADMIN_CHAT_ID or TELEGRAM_CHAT_ID
+    alerts.recovery = ALERT_RECOVERY or ALERT_RECOVERY_CYCLES * RETRY_TIME
+
+
+def wait_next_cycle(config, health, alerts, stop):
+    """Ждет RETRY_TIME секунд до следующего опроса.
+    Если за это время настройки перезагружены, ожидание продолжается
+    с новым RETRY_TIME без повторного опроса API. Если установлено
+    событие stop, ожидание не начинается
+    """
+    started = time.monotonic()
+    while not stop.is_set() and config.wait(
+            RETRY_TIME - (time.monotonic() - started)):
+        config.reload()
+        tune(health, alerts)
+
+
 def check_tokens():
     """Проверка переменных окружения."""
     check_tokens = [token for token in TOKENS if globals()[token] is None]
@@ -129,37 +337,94 @@ def check_tokens():
     return True
 
 
-def main():
-    """Основная логика работы бота."""
+def check_homeworks(current_timestamp, state, target, transitions, digest,
+                    health):
+    """Опрашивает API и ставит в сводку сообщение об изменении статуса.
+    Пустой список работ означает, что статусы не менялись.
+    Возвращает временную метку для следующего опроса
+    """
+    response = get_api_answer(current_timestamp)
+    health.mark("poll")
+    homeworks = check_response(response)
+    transitions.record(homeworks, response.get("current_date"))
+    if not homeworks:
+        return current_timestamp
+    homework = homeworks[0]
+    message = parse_status(homework)
+    latest = homework.get("homework_name"), homework.get("status")
+    if message is not None and state.get(target) != latest:
+        digest.add(TELEGRAM_CHAT_ID, homework["status"], message)
+        state.update(target, *latest)
+        current_timestamp = response.get("current_date", current_timestamp)
+        logging.info(SEND_MESSAGE.format(message=message))
+    return current_timestamp
+
+
+def flush_digest(digest):
+    """Отправляет сводки с истекшим интервалом.
+    Вызывается на каждом цикле, даже если опрос API не удался
+    """
+    try:
+        digest.flush()
+    except Exception as error:
+        logging.error(PROGRAM_FAILURE.format(error=error))
+
+
+def main(stop=None):
+    """Основная логика работы бота.
+    Цикл работает до установки события stop. При выходе фоновые потоки
+    останавливаются, обработчики сигналов возвращаются прежние
+    """
     if not check_tokens():
         message = "Отсутствуют переменные окружения"
         raise ValueError(message)
 
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time()) - ONE_MONTH
-    previous_message = None
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            homework = check_response(response)[0]
-            message = parse_status(homework)
-            if message != previous_message:
-                send_message(bot, message)
-                current_timestamp = response.get(
-                    "current_date", current_timestamp)
-                logging.info(SEND_MESSAGE.format(message=message))
-                previous_message = message
+    stop = stop or threading.Event()
+    with ExitStack() as stack:
+        restore_signals_on_exit(stack)
+        config = start_config(stack, stop)
+        bot = telegram.Bot(token=TELEGRAM_TOKEN)
+        if TRACER.path is not None:
+            install_http_tracing(TRACER)
+        profiler = SamplingProfiler()
+        install_profiler_signal(profiler, PROFILE_PREFIX)
+        stack.callback(profiler.finish, PROFILE_PREFIX)
+        health = HealthState(WATCHDOG_FACTOR * RETRY_TIME)
+        stop_on_exit(
+            stack, stop, start_watchdog(health, WATCHDOG_INTERVAL, stop))
+        if HEALTH_PORT:
+            server = start_server(health, int(HEALTH_PORT))
+            stack.callback(server.server_close)
+            stack.callback(server.shutdown)
+        outbox = start_delivery(stack, stop, bot, health)
+        current_timestamp = int(time.time()) - ONE_MONTH
+        state = StateStore(HOMEWORK_VERDICTS)
+        target = state.add_target()
+        transitions = TransitionLog(HOMEWORK_VERDICTS, TRANSITIONS_FILE)
+        stop_on_exit(stack, stop, start_commands(bot, transitions, stop))
+        digest = Digest(
+            outbox.send, DIGEST_INTERVAL, DIGEST_SIZE, DIGEST_IMMEDIATE,
+            time.time, DIGEST_FILE)
+        alerts = AlertAggregator(
+            partial(outbox.send, sinks=[TELEGRAM]), None, ERROR_TEMPLATES,
+            ALERT_WINDOW)
+        tune(health, alerts)
+        while not stop.is_set():
+            health.mark("cycle")
+            try:
+                current_timestamp = check_homeworks(
+                    current_timestamp, state, target, transitions, digest,
+                    health)
+                alerts.success()
 
-        except Exception as error:
-            message = PROGRAM_FAILURE.format(error=error)
-            if message != previous_message:
-                logging.error(message)
+            except Exception as error:
+                logging.error(PROGRAM_FAILURE.format(error=error))
                 try:
-                    send_message(bot, message)
-                    previous_message = message
-                except CustomBotException as error:
+                    alerts.error(error)
+                except Exception as error:
                     logging.error(PROGRAM_FAILURE.format(error=error))
-        time.sleep(RETRY_TIME)
+            flush_digest(digest)
+            wait_next_cycle(config, health, alerts, stop)
 
 
 if __name__ == "__main__":
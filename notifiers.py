@@ -0,0 +1,70 @@
+import smtplib
+from email.message import EmailMessage
+
+import requests
+
+TELEGRAM = "Telegram"
+EMAIL_SUBJECT = "Статус домашней работы"
+
+
+class TelegramNotifier:
+    """Отправка в Telegram через экземпляр telegram.Bot."""
+
+    def __init__(self, bot):
+        """Параметр bot - экземпляр telegram.Bot."""
+        self.bot = bot
+
+    def __repr__(self):
+        """Название способа доставки для лога."""
+        return TELEGRAM
+
+    def send(self, chat_id, text):
+        """Отправляет сообщение в чат chat_id."""
+        return self.bot.send_message(chat_id=chat_id, text=text)
+
+
+class WebhookNotifier:
+    """Отправка POST-запросом с JSON {"chat_id": ..., "text": ...}."""
+
+    def __init__(self, url, timeout=10):
+        """Параметр url - адрес, на который отправляются сообщения."""
+        self.url = url
+        self.timeout = timeout
+
+    def __repr__(self):
+        """Название способа доставки для лога."""
+        return f"Webhook {self.url}"
+
+    def send(self, chat_id, text):
+        """Отправляет сообщение, ошибочный код ответа - исключение."""
+        response = requests.post(
+            self.url, json={"chat_id": chat_id, "text": text},
+            timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+
+class SmtpNotifier:
+    """Отправка письмом через SMTP-сервер."""
+
+    def __init__(self, host, port, sender, recipients, timeout=10):
+        """Параметр recipients - список адресов получателей."""
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = list(recipients)
+        self.timeout = timeout
+
+    def __repr__(self):
+        """Название способа доставки для лога."""
+        return f"SMTP {self.host}:{self.port}"
+
+    def send(self, chat_id, text):
+        """Отправляет письмо, chat_id не используется."""
+        message = EmailMessage()
+        message["Subject"] = EMAIL_SUBJECT
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.recipients)
+        message.set_content(text)
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            return smtp.send_message(message)
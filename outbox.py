@@ -0,0 +1,185 @@
+import logging
+import sqlite3
+import threading
+import time
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sink TEXT NOT NULL,
+    chat_id TEXT,
+    text TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL
+)"""
+CREATE_INDEX = "CREATE INDEX IF NOT EXISTS outbox_sink ON outbox (sink, id)"
+SEND_FAILED = ("Сообщение {id} не отправлено через {sink} (попытка "
+               "{attempts}), повтор через {delay:.0f} с: {error}")
+REPLAYED = "Через {sink} из очереди отправлено {sent} сообщений"
+RETRIER_FAILED = "Сбой отправки очереди через {sink}: {error}"
+
+
+class Outbox:
+    """Очередь исходящих сообщений в SQLite.
+    Сообщение записывается в очередь отдельной строкой для каждого
+    способа доставки (sink) и удаляется после успешной отправки этим
+    способом, поэтому сбой одного способа не теряет сообщение, даже если
+    другие сработали. Отправкой занимается только drain: у каждого
+    способа свой фоновый поток retrier, поэтому медленный способ
+    не задерживает остальные. Сообщения одного способа уходят строго
+    по порядку, неотправленное сообщение задерживает следующие за ним.
+    Между попытками выдерживается экспоненциально растущая пауза.
+    Строки способов, которых больше нет в sinks, остаются в очереди.
+    """
+
+    def __init__(self, sinks, path, batch=50, base_delay=30, max_delay=3600,
+                 clock=time.time):
+        """Параметр sinks - словарь название -> функция отправки.
+        Функция отправки принимает chat_id и text
+        """
+        self.sinks = dict(sinks)
+        self.batch = batch
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.wakeups = {sink: threading.Event() for sink in self.sinks}
+        self.connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None)
+        self.connection.execute(CREATE_TABLE)
+        self.connection.execute(CREATE_INDEX)
+
+    def execute(self, sql, params=()):
+        """Выполняет запрос под блокировкой и возвращает все строки."""
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def put(self, chat_id, text, sinks=None):
+        """Записывает сообщение в очередь способов доставки sinks.
+        По умолчанию - всех способов. Возвращает названия способов,
+        в очередь которых попало сообщение
+        """
+        sinks = [sink for sink in (sinks or self.sinks) if sink in self.sinks]
+        if not sinks:
+            return []
+        now = self.clock()
+        # Одна вставка на все способы атомарна и без явной транзакции
+        self.execute(
+            "INSERT INTO outbox (sink, chat_id, text, created, next_attempt) "
+            "VALUES " + ", ".join(["(?, ?, ?, ?, ?)"] * len(sinks)),
+            [value for sink in sinks
+             for value in (sink, chat_id, text, now, now)])
+        return sinks
+
+    def pending(self, sink, limit=None):
+        """Возвращает первые сообщения способа доставки по порядку."""
+        return self.execute(
+            "SELECT id, chat_id, text, attempts, next_attempt FROM outbox "
+            "WHERE sink = ? ORDER BY id LIMIT ?",
+            (sink, limit or self.batch))
+
+    def __len__(self):
+        """Число неотправленных строк по всем способам доставки."""
+        return self.execute("SELECT COUNT(*) FROM outbox")[0][0]
+
+    def deliver(self, sink, message_id, chat_id, text, attempts):
+        """Пытается отправить сообщение из очереди способом sink.
+        При успехе удаляет строку из очереди, при ошибке откладывает
+        следующую попытку. Возвращает True при успешной отправке
+        """
+        try:
+            self.sinks[sink](chat_id, text)
+        except Exception as error:
+            attempts += 1
+            delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+            self.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt = ? "
+                "WHERE id = ?", (attempts, self.clock() + delay, message_id))
+            logging.error(SEND_FAILED.format(
+                id=message_id, sink=sink, attempts=attempts, delay=delay,
+                error=error))
+            return False
+        self.execute("DELETE FROM outbox WHERE id = ?", (message_id,))
+        return True
+
+    def send(self, chat_id, text, sinks=None):
+        """Ставит сообщение в очередь и будит фоновую отправку.
+        Ошибки отправки сюда не доходят: сообщение остается в очереди.
+        Возвращает число строк, записанных в очередь
+        """
+        sinks = self.put(chat_id, text, sinks)
+        for sink in sinks:
+            self.wakeups[sink].set()
+        return len(sinks)
+
+    def wake(self):
+        """Будит фоновую отправку всех способов доставки."""
+        for wakeup in self.wakeups.values():
+            wakeup.set()
+
+    def drain(self, sink):
+        """Отправляет пачку сообщений одного способа доставки по порядку.
+        Пачка прерывается на первой ошибке и на сообщении, пауза перед
+        повтором которого не истекла. Возвращает число отправленных
+        """
+        sent = 0
+        now = self.clock()
+        for message_id, chat_id, text, attempts, next_attempt in (
+                self.pending(sink)):
+            if next_attempt > now or not self.deliver(
+                    sink, message_id, chat_id, text, attempts):
+                break
+            sent += 1
+        if sent:
+            logging.info(REPLAYED.format(sink=sink, sent=sent))
+        if sent == self.batch:
+            self.wakeups[sink].set()
+        return sent
+
+    def retry(self):
+        """Отправляет по пачке сообщений каждым способом доставки.
+        Способы обслуживаются по очереди в текущем потоке.
+        Возвращает число отправленных сообщений
+        """
+        return sum(map(self.drain, self.sinks))
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        with self.lock:
+            self.connection.close()
+
+
+def retrier(outbox, sink, interval, stop=None):
+    """Отправляет сообщения из очереди способа доставки sink.
+    Новые сообщения отправляются сразу после send, неотправленные
+    повторяются не реже раза в interval секунд, полная пачка
+    сразу продолжается следующей. После сбоя самой очереди
+    (например, ошибки SQLite) отправка возобновляется через interval
+    """
+    stop = stop or threading.Event()
+    wakeup = outbox.wakeups[sink]
+    while not stop.is_set():
+        wakeup.clear()
+        try:
+            outbox.drain(sink)
+        except Exception as error:
+            logging.error(RETRIER_FAILED.format(sink=sink, error=error))
+            stop.wait(interval)
+            continue
+        wakeup.wait(interval)
+
+
+def start_retrier(outbox, interval, stop=None):
+    """Запускает retrier каждого способа доставки в своем потоке.
+    Потоки работают до установки события stop; чтобы они не дожидались
+    interval, после stop нужно вызвать outbox.wake.
+    Возвращает словарь название способа -> поток
+    """
+    threads = {}
+    for sink in outbox.sinks:
+        threads[sink] = threading.Thread(
+            target=retrier, args=(outbox, sink, interval, stop),
+            name=f"outbox-{sink}", daemon=True)
+        threads[sink].start()
+    return threads
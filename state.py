@@ -0,0 +1,92 @@
+import sys
+import tracemalloc
+from array import array
+
+NO_STATUS = -1
+NO_NAME = -1
+BENCHMARK_TARGETS = 100_000
+BENCHMARK_NAMES = ("hw_python_oop", "hw02_community", "hw03_forms",
+                   "hw04_tests", "hw05_final", "api_final_yatube")
+BENCHMARK_REPORT = ("Целей: {targets}, памяти: {total} байт, "
+                    "{per_target:.1f} байт на отслеживаемую работу")
+
+
+class StateStore:
+    """Компактное хранилище последнего статуса работы для множества целей.
+    Цель (токен, за работами которого следит бот) - это номер строки.
+    Состояние хранится в колонках-массивах: номер имени работы и код
+    статуса (индекс в statuses). Имена работ интернируются и хранятся
+    один раз на все цели, поэтому на цель приходится несколько байт.
+    """
+
+    def __init__(self, statuses):
+        """Параметр statuses - допустимые статусы (HOMEWORK_VERDICTS)."""
+        self.statuses = tuple(statuses)
+        self.codes = {status: code for code, status in enumerate(statuses)}
+        self.names = []
+        self.name_ids = {}
+        self.homework_names = array("i")
+        self.status_codes = array("b")
+
+    def __len__(self):
+        """Число целей."""
+        return len(self.status_codes)
+
+    def add_target(self):
+        """Добавляет цель и возвращает ее номер."""
+        self.homework_names.append(NO_NAME)
+        self.status_codes.append(NO_STATUS)
+        return len(self.status_codes) - 1
+
+    def intern(self, name):
+        """Возвращает номер имени работы, добавляя его при необходимости."""
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = self.name_ids[sys.intern(name)] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def update(self, target, name, status):
+        """Запоминает статус работы цели.
+        Возвращает True, если работа или ее статус изменились
+        """
+        name_id = self.intern(name)
+        code = self.codes[status]
+        if (self.homework_names[target] == name_id
+                and self.status_codes[target] == code):
+            return False
+        self.homework_names[target] = name_id
+        self.status_codes[target] = code
+        return True
+
+    def get(self, target):
+        """Возвращает пару (имя работы, статус) цели или None."""
+        code = self.status_codes[target]
+        if code == NO_STATUS:
+            return None
+        return self.names[self.homework_names[target]], self.statuses[code]
+
+
+def benchmark(statuses, targets=BENCHMARK_TARGETS):
+    """Измеряет память хранилища на targets целях.
+    Возвращает общий объем в байтах и объем на одну работу
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = StateStore(statuses)
+    for number in range(targets):
+        store.update(
+            store.add_target(),
+            BENCHMARK_NAMES[number % len(BENCHMARK_NAMES)],
+            store.statuses[number % len(store.statuses)])
+    total = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return total, total / targets
+
+
+if __name__ == "__main__":
+    from homework import HOMEWORK_VERDICTS
+
+    total, per_target = benchmark(HOMEWORK_VERDICTS)
+    print(BENCHMARK_REPORT.format(
+        targets=BENCHMARK_TARGETS, total=total, per_target=per_target))
@@ -19,3 +19,26 @@ def current_timestamp():
 @pytest.fixture
 def api_url():
     return "https://practicum.yandex.ru/api/user_api/homework_statuses/"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class SentMessages(list):
+    def send(self, chat_id, text):
+        self.append((chat_id, text))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sent():
+    return SentMessages()
@@ -0,0 +1,79 @@
+import alerts
+
+TEMPLATES = ("Ошибка {error}\nпри запросе к {url}", "Код возврата <{code}>")
+
+
+class TestAlerts:
+    def test_fingerprint_ignores_values(self):
+        patterns = alerts.compile_templates(TEMPLATES)
+        first = alerts.fingerprint(
+            ConnectionError("Ошибка timeout\nпри запросе к a"), patterns)
+        second = alerts.fingerprint(
+            ConnectionError("Ошибка reset\nпри запросе к b"), patterns)
+        assert first == second, (
+            "Отпечаток не должен зависеть от подставленных значений"
+        )
+        assert first != alerts.fingerprint(
+            ValueError("Ошибка timeout\nпри запросе к a"), patterns)
+
+    def test_fingerprint_key_error(self):
+        patterns = alerts.compile_templates(["В словаре нет ключа {key}"])
+        assert alerts.fingerprint(
+            KeyError("В словаре нет ключа status"), patterns
+        ) == alerts.fingerprint(
+            KeyError("В словаре нет ключа homework_name"), patterns), (
+            "KeyError должен сопоставляться с шаблоном без кавычек"
+        )
+
+    def test_fingerprint_unknown_message(self):
+        assert alerts.fingerprint(IndexError("oops")) == "IndexError: oops"
+
+    def test_flapping_errors_cost_one_alert(self, sent, clock):
+        retry_time = 600
+        aggregator = alerts.AlertAggregator(
+            sent.send, "admin", TEMPLATES, window=3600,
+            recovery=3 * retry_time, clock=clock)
+        for cycle in range(10):
+            clock.now = cycle * retry_time
+            if cycle % 2:
+                aggregator.success()
+            else:
+                aggregator.error(ValueError(f"Код возврата <{500 + cycle}>"))
+        assert [text.split(":")[0] for _, text in sent] == [
+            "Сбой в работе программы", "Сбой продолжается"], (
+            "Чередование ошибок и успешных циклов - один сбой, "
+            "повтор только по истечении окна"
+        )
+        assert sent[0][0] == "admin"
+        clock.now = 8 * retry_time + 3 * retry_time
+        assert aggregator.success()
+        assert len(sent) == 3
+        assert not aggregator.success()
+
+    def test_window_survives_recovery(self, sent, clock):
+        aggregator = alerts.AlertAggregator(
+            sent.send, "admin", TEMPLATES, window=3600, recovery=600,
+            clock=clock)
+        aggregator.error(ValueError("Код возврата <500>"))
+        clock.now = 600
+        assert aggregator.success()
+        clock.now = 1200
+        assert not aggregator.error(ValueError("Код возврата <502>")), (
+            "Сбой, возобновившийся раньше окна, не должен давать оповещение"
+        )
+        clock.now = 1800
+        assert not aggregator.success(), (
+            "О сбое без оповещения не сообщается и восстановление"
+        )
+        assert len(sent) == 2
+
+    def test_repeat_alert_after_window(self, sent, clock):
+        aggregator = alerts.AlertAggregator(
+            sent.send, "admin", TEMPLATES, window=3600, clock=clock)
+        aggregator.error(ValueError("Код возврата <500>"))
+        clock.now = 1800
+        assert not aggregator.error(ValueError("Код возврата <502>"))
+        clock.now = 3600
+        assert aggregator.error(ValueError("Код возврата <503>"))
+        assert sent[-1][1] == alerts.ALERT_REPEAT.format(
+            error="Код возврата <503>", minutes=60, count=2)
@@ -0,0 +1,70 @@
+import numpy as np
+
+import analytics
+
+STATUSES = ("approved", "reviewing", "rejected")
+HOUR = 3600
+
+
+class TestAnalytics:
+    def make_log(self, path=None):
+        log = analytics.TransitionLog(STATUSES, path)
+        log.record([
+            {"homework_name": "hw1", "status": "reviewing",
+             "date_updated": "2022-01-01T00:00:00Z"},
+        ])
+        log.add("hw1", "rejected", log.timestamps[0] + HOUR)
+        log.add("hw1", "reviewing", log.timestamps[0] + 2 * HOUR)
+        log.add("hw1", "approved", log.timestamps[0] + 5 * HOUR)
+        log.add("hw2", "reviewing", 0)
+        return log
+
+    def test_repeated_status_is_not_transition(self):
+        log = analytics.TransitionLog(STATUSES)
+        assert log.add("hw", "reviewing", 0)
+        assert not log.add("hw", "reviewing", 10), (
+            "Повтор статуса не должен считаться переходом"
+        )
+        assert len(log.timestamps) == 1
+
+    def test_stats(self):
+        stats = self.make_log().stats()
+        reviewing = STATUSES.index("reviewing")
+        rejected = STATUSES.index("rejected")
+        assert stats["time_in_status"][0, reviewing] == 4 * HOUR
+        assert stats["time_in_status"][0, rejected] == HOUR
+        assert stats["time_in_status"][1].sum() == 0, (
+            "Незавершенный интервал не должен учитываться"
+        )
+        assert list(stats["rework"]) == [1, 0]
+        assert np.isclose(stats["turnaround"][50], 2 * HOUR)
+
+    def test_log_restored_from_file(self, tmp_path):
+        path = tmp_path / "transitions.csv"
+        log = analytics.TransitionLog(STATUSES, path)
+        log.record([{"homework_name": "hw1", "status": "reviewing"}], 100)
+        log.record([{"homework_name": "hw1", "status": "approved"}], 200)
+        restored = analytics.TransitionLog(STATUSES, path)
+        assert list(restored.timestamps) == [100, 200]
+        assert restored.record(
+            [{"homework_name": "hw1", "status": "approved"}], 300) == 0
+
+    def test_report_empty(self):
+        report = analytics.TransitionLog(STATUSES).report()
+        assert analytics.REPORT_NO_TURNAROUND in report
+
+    def test_report_averages_only_entered_statuses(self):
+        log = analytics.TransitionLog(STATUSES)
+        log.add("hw1", "reviewing", 0)
+        log.add("hw1", "rejected", HOUR)
+        log.add("hw1", "reviewing", 3 * HOUR)
+        log.add("hw2", "reviewing", 0)
+        log.add("hw2", "approved", HOUR)
+        report = log.report()
+        assert analytics.REPORT_STATUS.format(
+            status="rejected", hours=2, homeworks=1) in report, (
+            "Работы, не бывавшие в статусе, не должны занижать среднее"
+        )
+        assert analytics.REPORT_STATUS.format(
+            status="reviewing", hours=1, homeworks=2) in report
+        assert "в статусе approved" not in report
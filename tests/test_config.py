@@ -0,0 +1,93 @@
+import json
+
+import config
+
+CURRENT = {
+    "PRACTICUM_TOKEN": "practicum",
+    "TELEGRAM_TOKEN": "1234:abc",
+    "TELEGRAM_CHAT_ID": "42",
+    "RETRY_TIME": 600,
+    "ONE_MONTH": 3600,
+    "ENDPOINT": "https://practicum.yandex.ru/api/",
+    "HOMEWORK_VERDICTS": {"approved": "Ура", "rejected": "Замечания"},
+}
+
+
+class TestConfig:
+    def test_priority(self, tmp_path):
+        env_file = tmp_path / ".env"
+        env_file.write_text("RETRY_TIME=300\nCHAT_TOKEN=7\n")
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({"RETRY_TIME": 60}))
+        settings = config.load_config(
+            CURRENT, str(env_file), str(config_file),
+            environ={"RETRY_TIME": "900", "ONE_MONTH": "7200"})
+        assert settings["RETRY_TIME"] == 60
+        assert settings["ONE_MONTH"] == 7200
+        assert settings["TELEGRAM_CHAT_ID"] == "7"
+        assert settings["ENDPOINT"] == CURRENT["ENDPOINT"]
+
+    def test_process_env_wins_over_env_file(self, tmp_path):
+        env_file = tmp_path / ".env"
+        env_file.write_text("RETRY_TIME=300\n")
+        settings = config.load_config(
+            CURRENT, str(env_file), environ={"RETRY_TIME": "900"})
+        assert settings["RETRY_TIME"] == 900, (
+            "Окружение процесса должно перекрывать .env, как в load_dotenv"
+        )
+
+    def test_removed_setting_reverts_to_default(self, tmp_path):
+        env_file = tmp_path / ".env"
+        env_file.write_text("RETRY_TIME=300\n")
+        current = config.load_config(
+            CURRENT, str(env_file), environ={}, defaults=CURRENT)
+        assert current["RETRY_TIME"] == 300
+        env_file.write_text("")
+        settings = config.load_config(
+            current, str(env_file), environ={}, defaults=CURRENT)
+        assert settings["RETRY_TIME"] == CURRENT["RETRY_TIME"]
+
+    def test_validation(self):
+        bad_values = (
+            {"RETRY_TIME": "-1"}, {"ENDPOINT": "ftp://host"},
+            {"PRACTICUM_TOKEN": ""},
+            {"HOMEWORK_VERDICTS": '{"approved": "Ура"}'},
+        )
+        for environ in bad_values:
+            try:
+                config.load_config(CURRENT, environ=environ)
+            except ValueError:
+                pass
+            else:
+                assert False, f"Настройки {environ} должны быть отклонены"
+        verdicts = {"approved": "Отлично", "rejected": "Доработать"}
+        settings = config.load_config(
+            CURRENT, environ={"HOMEWORK_VERDICTS": json.dumps(verdicts)})
+        assert settings["HOMEWORK_VERDICTS"] == verdicts
+
+    def test_watcher(self, tmp_path):
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({"RETRY_TIME": 60}))
+        current = dict(CURRENT)
+
+        def apply(settings):
+            changed = {name for name in settings
+                       if settings[name] != current[name]}
+            current.update(settings)
+            return changed
+
+        watcher = config.ConfigWatcher(
+            lambda: config.load_config(
+                current, config_file=str(config_file), environ={}),
+            apply, [str(config_file), None])
+        assert not watcher.wait(0)
+        assert watcher.reload() == {"RETRY_TIME"}
+
+        config_file.write_text("{broken")
+        watcher.mtimes[str(config_file)] = 0
+        watcher.check()
+        assert watcher.wait(0), "Изменение файла должно запросить перезагрузку"
+        assert watcher.reload() == set()
+        assert current["RETRY_TIME"] == 60, (
+            "Ошибочные настройки не должны применяться"
+        )
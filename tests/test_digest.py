@@ -0,0 +1,86 @@
+import digest
+
+
+class TestDigest:
+    def test_size_one_sends_immediately(self, sent, clock):
+        buffer = digest.Digest(sent.send, clock=clock)
+        buffer.add(1, "reviewing", "msg")
+        assert sent == [(1, "msg")]
+
+    def test_flush_by_size(self, sent, clock):
+        buffer = digest.Digest(
+            sent.send, interval=600, size=3, clock=clock)
+        for number in range(3):
+            buffer.add(1, "reviewing", f"msg{number}")
+        assert len(sent) == 1, "Сводка должна уйти одним сообщением"
+        assert sent[0][1].startswith(digest.DIGEST_HEADER.format(count=3))
+        assert not buffer.pending
+
+    def test_flush_by_interval(self, sent, clock):
+        buffer = digest.Digest(
+            sent.send, interval=600, size=100, clock=clock)
+        buffer.add(1, "reviewing", "first")
+        buffer.add(2, "rejected", "second")
+        assert buffer.flush() == 0
+        clock.now = 600
+        assert buffer.flush() == 2
+        assert sent == [(1, "first"), (2, "second")]
+
+    def test_immediate_status(self, sent, clock):
+        buffer = digest.Digest(
+            sent.send, interval=600, size=100, immediate=["approved"],
+            clock=clock)
+        buffer.add(1, "reviewing", "earlier")
+        buffer.add(2, "reviewing", "other")
+        buffer.add(1, "approved", "now")
+        assert len(sent) == 1
+        assert sent[0][1].splitlines()[1:] == [
+            digest.DIGEST_ITEM.format(message="earlier"),
+            digest.DIGEST_ITEM.format(message="now")], (
+            "Срочный статус не должен обгонять накопленную сводку"
+        )
+        assert buffer.pending == {2: ["other"]}
+
+    def test_failed_send_keeps_messages(self):
+        def failing_send(chat_id, text):
+            raise ConnectionError
+
+        buffer = digest.Digest(failing_send, interval=0, size=100)
+        buffer.add(1, "reviewing", "msg")
+        try:
+            buffer.flush()
+        except ConnectionError:
+            pass
+        assert buffer.pending == {1: ["msg"]}
+
+    def test_retry_after_failed_send_is_not_duplicated(self):
+        attempts = []
+
+        def flaky_send(chat_id, text):
+            attempts.append(text)
+            if len(attempts) == 1:
+                raise ConnectionError
+
+        buffer = digest.Digest(flaky_send, size=1)
+        try:
+            buffer.add(1, "reviewing", "msg")
+        except ConnectionError:
+            pass
+        buffer.add(1, "reviewing", "msg")
+        assert attempts == ["msg", "msg"], (
+            "Повтор сообщения после сбоя не должен попадать в сводку дважды"
+        )
+        assert not buffer.pending
+
+    def test_pending_survives_restart(self, sent, clock, tmp_path):
+        path = tmp_path / "digest.json"
+        buffer = digest.Digest(
+            sent.send, interval=600, size=100, clock=clock, path=path)
+        buffer.add(1, "reviewing", "first")
+        restored = digest.Digest(
+            sent.send, interval=600, size=100, clock=clock, path=path)
+        assert restored.pending == {1: ["first"]}
+        clock.now = 600
+        assert restored.flush() == 1
+        assert sent == [(1, "first")]
+        assert digest.Digest(print, path=path).pending == {}
@@ -0,0 +1,128 @@
+import json
+import random
+import signal
+import threading
+
+import requests
+
+import faults
+
+
+class TestFaults:
+    def test_latency_distributions(self):
+        rng = random.Random(1)
+        assert faults.make_latency(None)(rng) == 0
+        uniform = faults.make_latency(
+            {"distribution": "uniform", "low": 1, "high": 2})
+        assert all(1 <= uniform(rng) <= 2 for _ in range(100))
+        try:
+            faults.make_latency({"distribution": "pareto"})
+        except ValueError:
+            pass
+        else:
+            assert False, "Неизвестное распределение должно быть ошибкой"
+
+    def test_fault_probabilities(self):
+        profile = faults.FaultProfile(
+            {"timeout": 0.2, "status_codes": {"500": 0.3}},
+            random.Random(1))
+        picks = [profile.pick() for _ in range(10_000)]
+        assert 0.17 < picks.count(faults.FAULT_TIMEOUT) / len(picks) < 0.23
+        assert 0.27 < picks.count(500) / len(picks) < 0.33
+
+    def test_injected_practicum_faults(self):
+        injector = faults.FaultInjector({"cycles": 3, "practicum": {
+            "status_codes": {"502": 1}}})
+        assert injector.get("url").status_code == 502
+        injector.practicum.faults = [(faults.FAULT_MALFORMED, 1)]
+        try:
+            injector.get("url").json()
+        except ValueError:
+            pass
+        else:
+            assert False, "Битый JSON должен давать ValueError"
+        assert not injector.stop.is_set()
+        injector.practicum.faults = [(faults.FAULT_TIMEOUT, 1)]
+        try:
+            injector.get("url")
+        except requests.exceptions.Timeout:
+            pass
+        else:
+            assert False, "Ожидался таймаут"
+        assert injector.stop.is_set(), (
+            "После cycles опросов сценарий должен завершиться"
+        )
+
+    def test_lost_counts_only_observed_changes(self):
+        injector = faults.FaultInjector({"change_rate": 1, "practicum": {
+            "status_codes": {"502": 1}}})
+        injector.get("url")
+        injector.practicum.faults = []
+        homework = injector.get("url").json()["homeworks"][0]
+        injector.send(1, homework["homework_name"])
+        report = injector.report(1)
+        assert "Изменений статуса: 3, замечено ботом: 1, " in report
+        assert "потеряно: 0\n" in report, (
+            "Изменение, не попавшее в успешный ответ, не считается потерянным"
+        )
+
+    def test_queued_changes_are_not_lost(self):
+        injector = faults.FaultInjector({"change_rate": 1})
+        homework = injector.get("url").json()["homeworks"][0]
+        report = injector.report(1, [f"Статус {homework['homework_name']}"])
+        assert "доставлено: 0, в очереди: 1, потеряно: 0\n" in report, (
+            "Изменение, ожидающее в очереди, не считается потерянным"
+        )
+
+    def test_run_main_loop(self, tmp_path, monkeypatch):
+        scenario = {
+            "seed": 7, "cycles": 30, "retry_time": 0.001,
+            "change_rate": 0.5,
+            "practicum": {"status_codes": {"500": 0.1}},
+        }
+        threads = set(threading.enumerate())
+        handlers = {signum: signal.getsignal(signum)
+                    for signum in (signal.SIGHUP, signal.SIGUSR1)}
+        monkeypatch.setenv("RETRY_TIME", "3")
+        report = faults.run(scenario, str(tmp_path))
+        import homework
+
+        assert homework.RETRY_TIME == 600, "Настройки бота должны вернуться"
+        assert set(threading.enumerate()) == threads, (
+            "После прогона не должно оставаться фоновых потоков бота"
+        )
+        assert {signum: signal.getsignal(signum)
+                for signum in handlers} == handlers, (
+            "Обработчики сигналов должны вернуться"
+        )
+        assert report.startswith("Циклов: 30 ")
+        assert faults.REPORT_NO_DELAYS not in report, (
+            "Уведомления должны доставляться и под нагрузкой сбоями"
+        )
+
+    def test_digest_flushed_during_quiet_polls(self, tmp_path, monkeypatch):
+        import digest
+        import homework
+
+        monkeypatch.setattr(homework, "DIGEST_INTERVAL", 0.05)
+        monkeypatch.setattr(homework, "DIGEST_SIZE", 100)
+        monkeypatch.setattr(homework, "DIGEST_IMMEDIATE", ())
+        injector = faults.FaultInjector({"cycles": 30})
+        first = {"homeworks": [{"homework_name": "hw", "status": "reviewing"}]}
+
+        def get(url, **kwargs):
+            injector.polls += 1
+            if injector.polls >= injector.cycles:
+                injector.stop.set()
+            if injector.polls == 1:
+                return faults.FakeResponse(200, json.dumps(first))
+            if injector.polls % 2:
+                raise requests.exceptions.ConnectionError(url)
+            return faults.FakeResponse(200, '{"homeworks": []}')
+
+        injector.get = get
+        faults.run({}, str(tmp_path), injector)
+        assert digest.Digest(
+            print, path=tmp_path / "digest.json").pending == {}, (
+            "Сводка должна уйти по интервалу и без изменений статуса"
+        )
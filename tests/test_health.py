@@ -0,0 +1,56 @@
+import json
+import logging
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import health
+
+
+class TestHealth:
+    def test_state(self, clock):
+        state = health.HealthState(100, clock=clock)
+        assert state.healthy()
+        assert not state.ready(), "Без успешного опроса бот не готов"
+        send = state.tracked("send", lambda text: text)
+        assert send("msg") == "msg"
+        state.mark("poll")
+        clock.now = 50
+        assert state.ready()
+        assert state.since()["send"] == 50
+        clock.now = 150
+        assert not state.healthy()
+        assert not state.ready()
+
+    def test_server(self, clock):
+        state = health.HealthState(100, clock=clock)
+        server = health.start_server(state, 0, "127.0.0.1")
+        url = "http://127.0.0.1:{}".format(server.server_address[1])
+        try:
+            with urlopen(url + "/healthz") as response:
+                assert json.load(response)["ok"]
+            try:
+                urlopen(url + "/readyz")
+            except HTTPError as error:
+                assert error.code == 503
+            else:
+                assert False, "/readyz должен отвечать 503 до первого опроса"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_watchdog_dumps_stacks(self, caplog, clock):
+        state = health.HealthState(100, clock=clock)
+        clock.now = 200
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=health.watchdog, args=(state, 0.01, stop))
+        with caplog.at_level(logging.CRITICAL):
+            thread.start()
+            threading.Event().wait(0.1)
+            stop.set()
+            thread.join()
+        stalled = [record for record in caplog.records
+                   if "Стеки потоков" in record.getMessage()]
+        assert len(stalled) == 1, "Стеки должны выводиться один раз"
+        assert "test_watchdog_dumps_stacks" in stalled[0].getMessage()
@@ -0,0 +1,79 @@
+import json
+from email import message_from_bytes, policy
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import notifiers
+
+
+class SMTPStandIn(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер, запоминающий тела писем."""
+
+    messages = []
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.reply("220 localhost")
+        while True:
+            command = self.rfile.readline().decode().strip().upper()
+            if not command or command.startswith("QUIT"):
+                self.reply("221 bye")
+                return
+            if command.startswith("DATA"):
+                self.reply("354 go on")
+                lines = []
+                for line in iter(self.rfile.readline, b".\r\n"):
+                    lines.append(line)
+                self.messages.append(b"".join(lines))
+            self.reply("250 ok")
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    payloads = []
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        self.payloads.append(json.loads(self.rfile.read(length)))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestNotifiers:
+    def test_smtp(self):
+        server = serve(socketserver.ThreadingTCPServer(
+            ("127.0.0.1", 0), SMTPStandIn))
+        try:
+            notifier = notifiers.SmtpNotifier(
+                "127.0.0.1", server.server_address[1],
+                "bot@example.com", ["me@example.com"])
+            notifier.send(None, "Работа проверена")
+        finally:
+            server.shutdown()
+            server.server_close()
+        message = message_from_bytes(
+            SMTPStandIn.messages[-1], policy=policy.default)
+        assert message["To"] == "me@example.com"
+        assert message["Subject"] == notifiers.EMAIL_SUBJECT
+        assert message.get_content().strip() == "Работа проверена"
+
+    def test_webhook(self):
+        server = serve(HTTPServer(("127.0.0.1", 0), WebhookHandler))
+        try:
+            notifiers.WebhookNotifier(
+                f"http://127.0.0.1:{server.server_address[1]}/hook",
+            ).send(42, "text")
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert WebhookHandler.payloads[-1] == {"chat_id": 42, "text": "text"}
@@ -0,0 +1,188 @@
+import sqlite3
+import threading
+
+import outbox
+
+
+class FlakySink:
+    def __init__(self):
+        self.down = False
+        self.sent = []
+
+    def send(self, chat_id, text):
+        if self.down:
+            raise ConnectionError("telegram is down")
+        self.sent.append((chat_id, text))
+
+
+class TestOutbox:
+    def test_sent_message_is_removed(self, tmp_path, clock):
+        sink = FlakySink()
+        queue = outbox.Outbox(
+            {"telegram": sink.send}, tmp_path / "outbox.db", batch=2,
+            base_delay=10, clock=clock)
+        assert queue.send("1", "msg") == 1
+        assert sink.sent == [], "send только ставит сообщение в очередь"
+        assert queue.retry() == 1
+        assert sink.sent == [("1", "msg")]
+        assert len(queue) == 0
+
+    def test_failed_sink_is_retried_alone(self, tmp_path, clock):
+        telegram, webhook = FlakySink(), FlakySink()
+        telegram.down = True
+        queue = outbox.Outbox(
+            {"telegram": telegram.send, "webhook": webhook.send},
+            tmp_path / "outbox.db", batch=2, base_delay=10, clock=clock)
+        queue.send("1", "msg")
+        assert queue.retry() == 1
+        assert webhook.sent == [("1", "msg")]
+        assert len(queue) == 1, (
+            "Сбой одного способа не должен терять сообщение"
+        )
+        telegram.down = False
+        clock.now += 10
+        assert queue.retry() == 1
+        assert telegram.sent == [("1", "msg")]
+        assert webhook.sent == [("1", "msg")], "Повтор только для сбойного"
+
+    def test_failed_message_survives_restart(self, tmp_path, clock):
+        sink = FlakySink()
+        sink.down = True
+        queue = outbox.Outbox(
+            {"telegram": sink.send}, tmp_path / "outbox.db", batch=2,
+            base_delay=10, clock=clock)
+        for number in range(3):
+            queue.send(1, f"msg{number}")
+        assert queue.retry() == 0
+        queue.close()
+
+        sink.down = False
+        queue = outbox.Outbox(
+            {"telegram": sink.send}, tmp_path / "outbox.db", batch=2,
+            base_delay=10, clock=clock)
+        assert len(queue) == 3
+        assert queue.retry() == 0, "Повтор не должен начинаться до паузы"
+        clock.now += 10
+        assert queue.retry() == 2, "Повтор должен идти пачками"
+        assert queue.retry() == 1
+        assert [text for _, text in sink.sent] == ["msg0", "msg1", "msg2"]
+        assert len(queue) == 0
+
+    def test_new_message_waits_for_older(self, tmp_path, clock):
+        sink = FlakySink()
+        sink.down = True
+        queue = outbox.Outbox(
+            {"telegram": sink.send}, tmp_path / "outbox.db", batch=2,
+            base_delay=10, clock=clock)
+        queue.send(1, "reviewing")
+        queue.retry()
+        sink.down = False
+        queue.send(1, "approved")
+        assert queue.retry() == 0, (
+            "Новое сообщение не должно обгонять отложенное"
+        )
+        clock.now += 10
+        assert queue.retry() == 2
+        assert [text for _, text in sink.sent] == ["reviewing", "approved"]
+
+    def test_backoff_grows(self, tmp_path, clock):
+        sink = FlakySink()
+        sink.down = True
+        queue = outbox.Outbox(
+            {"telegram": sink.send}, tmp_path / "outbox.db", batch=2,
+            base_delay=10, clock=clock)
+        queue.send("1", "msg")
+        queue.retry()
+        for delay in (10, 20, 40):
+            clock.now += delay - 1
+            assert queue.retry() == 0
+            clock.now += 1
+            assert queue.retry() == 0
+        assert queue.execute("SELECT attempts FROM outbox") == [(4,)]
+
+    def test_send_to_selected_sinks(self, tmp_path, clock):
+        telegram, webhook = FlakySink(), FlakySink()
+        queue = outbox.Outbox(
+            {"telegram": telegram.send, "webhook": webhook.send},
+            tmp_path / "outbox.db", clock=clock)
+        assert queue.send("admin", "alert", ["telegram", "smtp"]) == 1
+        queue.retry()
+        assert telegram.sent == [("admin", "alert")]
+        assert webhook.sent == []
+
+    def test_slow_sink_does_not_delay_others(self, tmp_path):
+        release = threading.Event()
+        telegram = FlakySink()
+        queue = outbox.Outbox(
+            {"telegram": telegram.send,
+             "webhook": lambda chat_id, text: release.wait(5)},
+            tmp_path / "outbox.db")
+        stop = threading.Event()
+        threads = outbox.start_retrier(queue, 60, stop)
+        try:
+            for number in range(2):
+                queue.send("1", f"msg{number}")
+            for _ in range(100):
+                if len(telegram.sent) == 2:
+                    break
+                stop.wait(0.01)
+            assert len(telegram.sent) == 2, (
+                "Медленный способ доставки не должен задерживать остальные"
+            )
+        finally:
+            stop.set()
+            release.set()
+            queue.wake()
+            for thread in threads.values():
+                thread.join(1)
+
+    def test_retrier_sends_on_wakeup(self, tmp_path, clock):
+        sink = FlakySink()
+        queue = outbox.Outbox(
+            {"telegram": sink.send}, tmp_path / "outbox.db", batch=2,
+            base_delay=10, clock=clock)
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=outbox.retrier, args=(queue, "telegram", 60, stop))
+        thread.start()
+        for number in range(3):
+            queue.send(1, f"msg{number}")
+        for _ in range(100):
+            if len(sink.sent) == 3:
+                break
+            stop.wait(0.01)
+        stop.set()
+        queue.wake()
+        thread.join(1)
+        assert [text for _, text in sink.sent] == ["msg0", "msg1", "msg2"]
+
+    def test_retrier_survives_queue_errors(self, tmp_path, clock):
+        sink = FlakySink()
+        queue = outbox.Outbox(
+            {"telegram": sink.send}, tmp_path / "outbox.db", clock=clock)
+        drain = queue.drain
+        failures = []
+
+        def broken_drain(name):
+            if not failures:
+                failures.append(name)
+                raise sqlite3.OperationalError("database is locked")
+            return drain(name)
+
+        queue.drain = broken_drain
+        queue.send(1, "msg")
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=outbox.retrier, args=(queue, "telegram", 0.01, stop))
+        thread.start()
+        for _ in range(100):
+            if sink.sent:
+                break
+            stop.wait(0.01)
+        stop.set()
+        queue.wake()
+        thread.join(1)
+        assert not thread.is_alive()
+        assert sink.sent == [("1", "msg")], (
+            "Ошибка очереди не должна останавливать отправку"
+        )
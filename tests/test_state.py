@@ -0,0 +1,30 @@
+import state
+
+STATUSES = ("approved", "reviewing", "rejected")
+
+
+class TestState:
+    def test_update(self):
+        store = state.StateStore(STATUSES)
+        target = store.add_target()
+        assert store.get(target) is None
+        assert store.update(target, "hw1", "reviewing")
+        assert not store.update(target, "hw1", "reviewing"), (
+            "Повтор статуса не должен считаться изменением"
+        )
+        assert store.update(target, "hw1", "approved")
+        assert store.update(target, "hw2", "approved")
+        assert store.get(target) == ("hw2", "approved")
+
+    def test_names_are_shared(self):
+        store = state.StateStore(STATUSES)
+        for _ in range(10):
+            store.update(store.add_target(), "hw1", "reviewing")
+        assert len(store) == 10
+        assert store.names == ["hw1"]
+
+    def test_benchmark(self):
+        total, per_target = state.benchmark(STATUSES, 10_000)
+        assert per_target < 50, (
+            f"На одну работу приходится {per_target:.1f} байт"
+        )
@@ -0,0 +1,106 @@
+import json
+import os
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+import tracing
+
+
+def load_trace(path):
+    text = path.read_text(encoding="UTF-8").rstrip().rstrip(",")
+    return json.loads(text + "]")
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestTracing:
+    def test_spans(self, tmp_path):
+        path = tmp_path / "trace.json"
+        tracer = tracing.Tracer(str(path))
+
+        @tracer.traced
+        def parse_status(homework):
+            return homework
+
+        with tracer.span("cycle", number=1):
+            assert parse_status("hw") == "hw"
+        events = load_trace(path)
+        assert [event["name"] for event in events] == [
+            "parse_status", "cycle"]
+        assert events[1]["args"] == {"number": 1}
+        assert events[1]["dur"] >= events[0]["dur"]
+
+    def test_disabled_tracer(self):
+        tracer = tracing.Tracer()
+        with tracer.span("cycle"):
+            pass
+        assert tracer.file is None
+
+    def test_http_spans(self, tmp_path):
+        server = HTTPServer(("127.0.0.1", 0), OkHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        path = tmp_path / "trace.json"
+        tracer = tracing.Tracer(str(path))
+        tracing.install_http_tracing(tracer)
+        tracing.install_http_tracing(tracer)
+        try:
+            requests.get(f"http://127.0.0.1:{server.server_address[1]}/")
+        finally:
+            tracer.path = None
+            server.shutdown()
+            server.server_close()
+        names = [event["name"] for event in load_trace(path)]
+        assert names.count("connect") == 1, (
+            "Повторная установка не должна дублировать интервалы"
+        )
+        assert names.count("first_byte") == 1
+
+    def test_profiler_signal(self, tmp_path):
+        prefix = str(tmp_path / "bot")
+        previous = signal.getsignal(signal.SIGUSR1)
+        try:
+            assert tracing.install_profiler_signal(
+                tracing.SamplingProfiler(0.001), prefix)
+            os.kill(os.getpid(), signal.SIGUSR1)
+            deadline = time.monotonic() + 0.05
+            while time.monotonic() < deadline:
+                pass
+            os.kill(os.getpid(), signal.SIGUSR1)
+        finally:
+            signal.signal(signal.SIGUSR1, previous)
+        profiles = list(tmp_path.glob("bot.*.folded"))
+        assert len(profiles) == 1
+        assert "test_profiler_signal" in profiles[0].read_text(
+            encoding="UTF-8")
+
+    def test_json_decode_span(self, tmp_path, monkeypatch):
+        import homework
+
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return {"homeworks": []}
+
+        path = tmp_path / "trace.json"
+        monkeypatch.setattr(homework.TRACER, "path", str(path))
+        monkeypatch.setattr(homework.TRACER, "file", None)
+        monkeypatch.setattr(
+            requests, "get", lambda *args, **kwargs: Response())
+        homework.get_api_answer(0)
+        homework.TRACER.file.close()
+        assert [event["name"] for event in load_trace(path)] == [
+            "json_decode", "get_api_answer"]
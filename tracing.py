@@ -0,0 +1,163 @@
+import functools
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+PROFILE_STARTED = "Профилирование запущено, интервал {interval} с"
+PROFILE_SAVED = "Профиль из {samples} замеров сохранен в {path}"
+PROFILE_FILE = "{prefix}.{moment}.folded"
+
+
+class Tracer:
+    """Записывает интервалы (span) в формате Chrome Trace Event.
+    Файл открывается в chrome://tracing или ui.perfetto.dev.
+    События дописываются по одному: формат допускает массив
+    без закрывающей скобки. Если path не задан, трассировка выключена.
+    """
+
+    def __init__(self, path=None):
+        """Параметр path - файл для записи трассировки."""
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    def write(self, event):
+        """Дописывает событие в файл трассировки."""
+        with self.lock:
+            if self.file is None:
+                new = not os.path.exists(self.path) or not os.path.getsize(
+                    self.path)
+                self.file = open(self.path, "a", encoding="UTF-8")
+                if new:
+                    self.file.write("[\n")
+            self.file.write(json.dumps(event, ensure_ascii=False) + ",\n")
+            self.file.flush()
+
+    @contextmanager
+    def span(self, name, **args):
+        """Замеряет время выполнения блока кода."""
+        if self.path is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.write({
+                "name": name, "ph": "X", "ts": start * 1e6,
+                "dur": (end - start) * 1e6, "pid": os.getpid(),
+                "tid": threading.get_ident(), "args": args})
+
+    def traced(self, func, name=None):
+        """Декоратор: оборачивает каждый вызов функции в span.
+        По умолчанию span называется именем функции
+        """
+        name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def install_http_tracing(tracer):
+    """Добавляет интервалы внутри HTTP-запросов requests (urllib3).
+    connect - DNS и TCP-соединение, tls - установка защищенного
+    соединения вместе с connect, first_byte - ожидание заголовков ответа.
+    """
+    patches = (
+        (HTTPConnection, "_new_conn", "connect"),
+        (HTTPSConnection, "connect", "tls"),
+        (HTTPConnection, "getresponse", "first_byte"),
+    )
+    for cls, method, name in patches:
+        original = getattr(cls, method)
+        if getattr(original, "traced", False):
+            continue
+
+        def wrapper(self, *args, _original=original, _name=name, **kwargs):
+            if "buffering" in kwargs:
+                # urllib3 сначала пробует getresponse(buffering=True)
+                # из Python 2 и сразу получает TypeError
+                return _original(self, *args, **kwargs)
+            with tracer.span(_name, host=self.host):
+                return _original(self, *args, **kwargs)
+        wrapper.traced = True
+        setattr(cls, method, functools.wraps(original)(wrapper))
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик основного потока.
+    Раз в interval секунд по таймеру ITIMER_REAL запоминает стек
+    основного потока. Результат сохраняется в формате folded stacks
+    (flamegraph.pl, speedscope).
+    """
+
+    def __init__(self, interval=0.005):
+        """Параметр interval - период замеров в секундах."""
+        self.interval = interval
+        self.samples = Counter()
+        self.running = False
+
+    def sample(self, signum, frame):
+        """Обработчик SIGALRM: запоминает текущий стек."""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({code.co_filename}:"
+                         f"{frame.f_lineno})")
+            frame = frame.f_back
+        self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        """Запускает замеры."""
+        self.samples.clear()
+        signal.signal(signal.SIGALRM, self.sample)
+        signal.setitimer(signal.ITIMER_REAL, self.interval, self.interval)
+        self.running = True
+        logging.info(PROFILE_STARTED.format(interval=self.interval))
+
+    def stop(self, path):
+        """Останавливает замеры и сохраняет профиль в path."""
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        self.running = False
+        with open(path, "w", encoding="UTF-8") as file:
+            for stack, count in self.samples.items():
+                file.write(f"{stack} {count}\n")
+        logging.info(PROFILE_SAVED.format(
+            samples=sum(self.samples.values()), path=path))
+
+    def finish(self, prefix):
+        """Останавливает замеры, если они идут, и сохраняет профиль."""
+        if self.running:
+            self.toggle(prefix)
+
+    def toggle(self, prefix):
+        """Запускает замеры или останавливает их и сохраняет профиль."""
+        if self.running:
+            self.stop(PROFILE_FILE.format(
+                prefix=prefix, moment=time.strftime("%Y%m%d-%H%M%S")))
+        else:
+            self.start()
+
+
+def install_profiler_signal(profiler, prefix, signum=None):
+    """Включает переключение профилировщика сигналом (по умолчанию SIGUSR1).
+    Профиль сохраняется в файл вида <prefix>.<время>.folded.
+    Возвращает False, если платформа не поддерживает сигналы
+    """
+    signum = signum or getattr(signal, "SIGUSR1", None)
+    if signum is None or not hasattr(signal, "setitimer"):
+        return False
+    signal.signal(signum, lambda *args: profiler.toggle(prefix))
+    return True